@@ -1,13 +1,27 @@
 import logging
-from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException, Form
+from datetime import datetime, timezone
+from typing import Annotated, Optional
+from fastapi import APIRouter, Depends, HTTPException, Form, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from starlette import status
 from fastapi.security import OAuth2PasswordRequestForm
+from jose import JWTError, jwt
 from app.db.base import get_db
 from app.core.config import settings
-from app.core.security import authenticate_user, create_access_token
+from app.core.login_limiter import login_limiter
+from app.core.password_hasher import password_hasher
+from app.schemas.auth import RefreshTokenRequest
+from app.services.refresh_token_service import RefreshTokenService
+from app.services.revocation_list import revocation_list
+from app.services.token_cache import token_cache
+from app.core.security import (
+    authenticate_user,
+    create_access_token,
+    create_principal_claims,
+)
 
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
@@ -18,7 +32,8 @@ db_dependency = Annotated[Session, Depends(get_db)]
 @router.post(
     "/token"
 )  # full route will be /auth/token matching the tokenUrl of OAuth2PasswordBearer
-def get_access_token(
+async def get_access_token(
+    request: Request,
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     db: db_dependency,
     remember_me: bool = Form(False),  # Add remember_me field with default value False
@@ -42,30 +57,118 @@ def get_access_token(
             "user_name": Manager,
             "employee_id": 2,
             "roles": [{"role_id": 1, "name": "Manager", "description": "Manager role"}],
+            "refresh_token": "hLk0o2Y9yLzq4Xw3...",
         }
+        The refresh token is exchanged at `/auth/refresh` for a new access token without the password.
 
     Raises:
 
-        - HTTPException: If the user cannot be authenticated, or if any database or unexpected errors occur.
+        - HTTPException: If the user cannot be authenticated, if there were too many login attempts
+          for the username or client (429), or if any database or unexpected errors occur.
     """
+    # Throttled before the password is verified, a rejected attempt costs no bcrypt work. Behind a
+    # proxy listed in FORWARDED_ALLOW_IPS, request.client is the client from X-Forwarded-For
+    login_limiter.check(
+        form_data.username, request.client.host if request.client else None
+    )
+
     try:
         # print(form_data.username, form_data.password)
         # print(remember_me)
-        user = authenticate_user(form_data.username, form_data.password, db)
+        user = await authenticate_user(form_data.username, form_data.password, db)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail=f"Could not validate the user with username {form_data.username}.",
             )
-        token = create_access_token(user.user_name, user.user_id, remember_me=remember_me)  # type: ignore
+        # Embed the roles and permission bitmask so that authorization needs no database access
+        claims = (
+            await run_in_threadpool(create_principal_claims, db, user)
+            if settings.STATELESS_PRINCIPAL_TOKENS
+            else None
+        )
+        token = create_access_token(user.user_name, user.user_id, remember_me=remember_me, claims=claims)  # type: ignore
+
+        # Encode before issuing the refresh token, its commit expires the loaded user and roles
+        response = jsonable_encoder(
+            {
+                "access_token": token,
+                "token_type": settings.ACCESS_TOKEN_TYPE,
+                "user_id": user.user_id,
+                "user_name": user.user_name,
+                "employee_id": user.employee_id,
+                "roles": user.roles,
+            }
+        )
+        response["refresh_token"] = await run_in_threadpool(
+            RefreshTokenService.issue, db, response["user_id"], remember_me
+        )
+        return response
+
+    except IntegrityError as e:
+        logging.error(f"Integrity error occurred: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e.orig))
+    except SQLAlchemyError as e:
+        logging.error(f"Database error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred while authenticating the user with username {form_data.username}.",
+        )
+    except HTTPException as e:
+        logging.error(f"HTTPException: {str(e)}")
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.detail,
+            headers=e.headers,  # Keeps Retry-After of a saturated password hasher
+        )
+    except Exception as e:
+        logging.error(f"Unexpected error: {str(e)}")
+        logging.error(e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred while authenticating the user with username {form_data.username}.",
+        )
+
+
+@router.post("/refresh")
+def refresh_access_token(db: db_dependency, refresh_request: RefreshTokenRequest):
+    """
+    Exchange a refresh token for a new access token and a new refresh token.
+    The presented refresh token is spent, presenting it again revokes every token rotated from
+    the same login. No password is involved, the lookup is a single indexed query.
+
+    Args:
+
+        - refresh_request (RefreshTokenRequest): The request body containing the refresh token.
+
+    Returns:
+
+        - dict: A dictionary containing the access token, token type and the new refresh token. Example:
+        {
+            "access_token": "eyJhbGckpXVCJ9.eyJzdWIiOiJ1c2VyM",
+            "token_type": "bearer",
+            "refresh_token": "hLk0o2Y9yLzq4Xw3...",
+        }
+
+    Raises:
+
+        - HTTPException: If the refresh token is invalid, expired or reused (401), or if any database or unexpected errors occur.
+    """
+    try:
+        user, refresh_token = RefreshTokenService.rotate(
+            db, refresh_request.refresh_token
+        )
+        claims = (
+            create_principal_claims(db, user)
+            if settings.STATELESS_PRINCIPAL_TOKENS
+            else None
+        )
+        token = create_access_token(user.user_name, user.user_id, claims=claims)  # type: ignore
 
         return {
             "access_token": token,
             "token_type": settings.ACCESS_TOKEN_TYPE,
-            "user_id": user.user_id,
-            "user_name": user.user_name,
-            "employee_id": user.employee_id,
-            "roles": user.roles,
+            "refresh_token": refresh_token,
         }
 
     except IntegrityError as e:
@@ -75,7 +178,7 @@ def get_access_token(
         logging.error(f"Database error: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"An error occurred while authenticating the user with username {form_data.username}.",
+            detail="An error occurred while refreshing the access token.",
         )
     except HTTPException as e:
         logging.error(f"HTTPException: {str(e)}")
@@ -85,8 +188,99 @@ def get_access_token(
         )
     except Exception as e:
         logging.error(f"Unexpected error: {str(e)}")
-        logging.error(e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"An error occurred while authenticating the user with username {form_data.username}.",
+            detail="An error occurred while refreshing the access token.",
+        )
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(
+    token: Annotated[str, Depends(settings.oauth2_bearer)],
+    db: db_dependency,
+    refresh_request: Optional[RefreshTokenRequest] = None,
+):
+    """
+    Revoke the presented access token and, when given, the refresh token of the same login.
+    The token is rejected by this worker at once and by the others within
+    `REVOCATION_SYNC_INTERVAL_SECONDS`.
+
+    Args:
+
+        - token (str): The bearer access token to revoke.
+        - refresh_request (RefreshTokenRequest, optional): The request body containing the refresh token.
+
+    Raises:
+
+        - HTTPException: If the access token is invalid (401), or if any database or unexpected errors occur.
+    """
+    try:
+        try:
+            payload = jwt.decode(
+                token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+            )
+        except JWTError:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate user.",
+            )
+
+        if payload.get("jti") is not None:
+            expires_at = datetime.fromtimestamp(payload["exp"], timezone.utc)
+            revocation_list.revoke_token(
+                db, payload["jti"], expires_at.replace(tzinfo=None)
+            )
+        if refresh_request is not None:
+            RefreshTokenService.revoke(db, refresh_request.refresh_token)
+        db.commit()
+        revocation_list.purge_expired(db)
+
+    except IntegrityError as e:
+        db.rollback()
+        logging.error(f"Integrity error occurred: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e.orig))
+    except SQLAlchemyError as e:
+        db.rollback()
+        logging.error(f"Database error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An error occurred while logging out.",
+        )
+    except HTTPException as e:
+        logging.error(f"HTTPException: {str(e)}")
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.detail,
         )
+    except Exception as e:
+        db.rollback()
+        logging.error(f"Unexpected error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An error occurred while logging out.",
+        )
+
+
+@router.get("/password-hasher/metrics")
+def read_password_hasher_metrics():
+    """
+    Report the load of the password hasher pool of this worker.
+
+    Returns:
+
+        - dict: The executor type and size, the current number of in-flight and queued jobs,
+          the submitted, completed and rejected counts and the average and maximum latency in ms.
+    """
+    return password_hasher.metrics()
+
+
+@router.get("/token-cache/metrics")
+def read_token_cache_metrics():
+    """
+    Report the decoded-token cache of this worker.
+
+    Returns:
+
+        - dict: The number of cached tokens, the maximum number of entries and the hit and miss counts.
+    """
+    return token_cache.metrics()
@@ -1,28 +1,34 @@
 import logging
-from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException, Path
+from typing import Annotated, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Path
 from sqlalchemy import select
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from starlette import status
+from app.db.async_base import get_async_db
 from app.db.base import get_db
+from app.db.loader_options import loader_options
 from app.schemas.scanned_invoice import (
     ScannedInvoiceReadRequest,
     ScannedInvoiceCreateRequest,
 )
-from app.db.models.employee import Employee
-from app.db.models.item import Item
-
 from app.db.models.scanned_invoice import ScannedInvoice
-from app.db.models.scanned_invoice_item import ScannedInvoiceItem
-from app.db.models.inventory_adjustment_log import InventoryAdjustmentLog
-from app.db.models.vendor import Vendor
+from app.services.invoice_service import InvoiceService
+from app.services.idempotency_service import IdempotencyService
 
 
 db_dependency = Annotated[Session, Depends(get_db)]
+async_db_dependency = Annotated[AsyncSession, Depends(get_async_db)]
 
 router = APIRouter(prefix="/invoices", tags=["Scanning Invoices"])
 
+# Async versions of the hot endpoints, included ahead of `router` when DB_ASYNC_ROUTES is set
+async_router = APIRouter(prefix="/invoices", tags=["Scanning Invoices"])
+
+# Scope of the Idempotency-Key header accepted by the POST endpoint
+IDEMPOTENCY_ENDPOINT = "POST /invoices/"
+
 
 @router.post(
     "/",
@@ -30,7 +36,9 @@ router = APIRouter(prefix="/invoices", tags=["Scanning Invoices"])
     # dependencies=[Depends(check_permissions("super user permission"))],
 )
 def process_scanned_invoice(
-    db: db_dependency, scanned_invoice_request: ScannedInvoiceCreateRequest
+    db: db_dependency,
+    scanned_invoice_request: ScannedInvoiceCreateRequest,
+    idempotency_key: Annotated[Optional[str], Header(max_length=255)] = None,
 ):
     """
     Processes a checkout scanned invoice by validating the employee, department, and items,
@@ -57,10 +65,13 @@ def process_scanned_invoice(
             #         }
             #     ]
             # }
+        idempotency_key (str, optional): The `Idempotency-Key` header. A retried request with the same key
+            gets the stored response back without being processed again.
     Raises:
 
         HTTPException:
-        - If the employee, or any item is not found in the database.
+        - If the employee, the vendor or any item code is not found in the database,
+            every unknown item code is listed in the error detail.
         - If there is an integrity error during the database scanned invoice.
         - If there is a general database error during the scanned invoice.
         - If there is an unexpected error during the scanned invoice.
@@ -70,123 +81,69 @@ def process_scanned_invoice(
             the scanned invoice ID and creation timestamp.
     """
 
-    try:
-        # Validate the employee exists
-        stmt = select(Employee.employee_id).where(
-            Employee.employee_id == scanned_invoice_request.scanned_by
-        )
-        employee_id = db.execute(stmt).scalars().first()
-        if employee_id is None:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Employee with id {scanned_invoice_request.scanned_by} not found.",
-            )
+    return _process_scanned_invoice(db, scanned_invoice_request, idempotency_key)
 
-        # Validate the vendor exists
-        stmt = select(Vendor.vendor_id).where(
-            Vendor.name == scanned_invoice_request.vendor_name
-        )
-        vendor_id = db.execute(stmt).scalars().first()
-        if vendor_id is None:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Vendor with name {scanned_invoice_request.vendor_name} not found.",
-            )
 
-        # Validate the image file path exists
-        # if scanned_invoice_request.image_file_path:
-        #     if not Path(scanned_invoice_request.image_file_path).exists():
-        #         logging.error(f"The image file path provided does not exist.")
-        #         raise HTTPException(
-        #             status_code=status.HTTP_400_BAD_REQUEST,
-        #             detail="The image file path provided does not exist.",
-        #         )
-
-        print("Scanned invoice request: ", scanned_invoice_request)
-        # Validate the list of scanned items
-        for item in scanned_invoice_request.scanned_invoice_items:
-            stmt = select(Item.item_id, Item.item_code).where(
-                Item.item_code == item.item_code
-            )
-            result = db.execute(stmt).fetchone()
-            if result is None:
-                logging.error(f"Item with item_code {item.item_code} not found.")
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Item with item_code {item.item_code} not found.",
-                )
-            print(item)
-            print(result)
-            # Add retrieved item_id to the item
-            item.item_id = result.item_id
-            print(item)
-
-        # Create the checkout scanned invoice
-        new_scanned_invoice = ScannedInvoice(
-            invoice_number=scanned_invoice_request.invoice_number,
-            vendor_id=vendor_id,
-            scanned_by=scanned_invoice_request.scanned_by,
-            image_file_path=scanned_invoice_request.image_file_path,
-            total_items=len(scanned_invoice_request.scanned_invoice_items),
-        )
-        db.add(new_scanned_invoice)
-        db.flush()  # Writes to the database to generate `scanned invoice_id` but doesn't commit
-
-        # Create the checkout items
-        for index, item in enumerate(scanned_invoice_request.scanned_invoice_items):
-            checkout_item = ScannedInvoiceItem(
-                scan_id=new_scanned_invoice.scan_id,
-                line_number=index + 1,
-                item_id=item.item_id,
-                item_code=item.item_code,
-                quantity=item.quantity,
-            )
-            db.add(checkout_item)
+@async_router.post("/", status_code=status.HTTP_201_CREATED)
+async def process_scanned_invoice_async(
+    db: async_db_dependency,
+    scanned_invoice_request: ScannedInvoiceCreateRequest,
+    idempotency_key: Annotated[Optional[str], Header(max_length=255)] = None,
+):
+    """
+    Async version of `process_scanned_invoice`, served instead of it when `DB_ASYNC_ROUTES`
+    is set.
+    """
+    return await db.run_sync(
+        _process_scanned_invoice, scanned_invoice_request, idempotency_key
+    )
 
-        db.commit()  # Commit the scanned invoice and all lines
 
-        # The scanned invoice is committed, so we can now fetch the scanned invoice and checkout items
-        stmt = select(ScannedInvoice).where(
-            ScannedInvoice.scan_id == new_scanned_invoice.scan_id
-        )
-        scanned_invoice_result = db.execute(stmt).scalars().first()
-        scanned_invoice_transaction_id = scanned_invoice_result.scan_id
-        print("Final result: ", scanned_invoice_transaction_id)
-        # After the scanned invoice is committed, we need to update the quantity of the items accordingly
-        if scanned_invoice_result is None:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to fetch the committed transaction.",
+def _process_scanned_invoice(
+    db: Session,
+    scanned_invoice_request: ScannedInvoiceCreateRequest,
+    idempotency_key: Optional[str],
+):
+    try:
+        if idempotency_key:
+            request_hash = IdempotencyService.request_hash(scanned_invoice_request)
+            stored_response = IdempotencyService.get_stored_response(
+                db, IDEMPOTENCY_ENDPOINT, idempotency_key, request_hash
             )
+            if stored_response is not None:
+                return stored_response
 
-        for item in scanned_invoice_result.scanned_invoice_items:
-            stmt = select(Item).where(Item.item_id == item.item_id)
-            result = db.execute(stmt).scalars().first()
-            if result:
-                old_value = result.quantity
-                new_value = result.quantity + item.quantity
-                result.quantity = new_value
-                # log the inventory adjustment in the database
-                inventory_adjustment_log = InventoryAdjustmentLog(
-                    item_id=item.item_id,
-                    old_quantity=old_value,
-                    new_quantity=new_value,
-                    quantity_changed=item.quantity,
-                    adjustment_type="received via scanned invoice",
-                    scanned_invoice_item_id=item.scanned_invoice_item_id,
-                    checkout_item_id=None,
-                )
-                db.add(inventory_adjustment_log)
-
-        # commit the changes to the database
-        db.commit()
-
-        return {
+        scan_id = InvoiceService.process(db, scanned_invoice_request)
+        response = {
             "message": "Scanned invoice processed successfully",
-            "scanned invoice": scanned_invoice_transaction_id,
+            "scanned invoice": scan_id,
         }
 
+        if idempotency_key:
+            IdempotencyService.store_response(
+                db,
+                IDEMPOTENCY_ENDPOINT,
+                idempotency_key,
+                request_hash,
+                status.HTTP_201_CREATED,
+                response,
+            )
+        db.commit()  # Commit the scanned invoice, all lines and the stock adjustments at once
+
+        if idempotency_key:
+            IdempotencyService.purge_expired(db)
+
+        return response
+
     except IntegrityError as e:
+        db.rollback()
+        if idempotency_key:
+            # A concurrent retry with the same key committed first, answer with its response
+            stored_response = IdempotencyService.get_stored_response(
+                db, IDEMPOTENCY_ENDPOINT, idempotency_key, request_hash
+            )
+            if stored_response is not None:
+                return stored_response
         logging.error(f"Integrity error occurred: {str(e)}")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e.orig))
     except SQLAlchemyError as e:
@@ -233,7 +190,7 @@ def read_all_scanned_invoices(db: db_dependency):
     """
     try:
         stmt = select(ScannedInvoice).options(
-            selectinload(ScannedInvoice.scanned_invoice_items)
+            *loader_options(ScannedInvoiceReadRequest)
         )
         result = db.execute(stmt).scalars().all()
 
@@ -278,8 +235,10 @@ def read_scanned_invoice(db: db_dependency, scanned_invoice_id: int = Path(gt=0)
     """
 
     try:
-        stmt = select(ScannedInvoice).where(
-            ScannedInvoice.scan_id == scanned_invoice_id
+        stmt = (
+            select(ScannedInvoice)
+            .options(*loader_options(ScannedInvoiceReadRequest))
+            .where(ScannedInvoice.scan_id == scanned_invoice_id)
         )
         scanned_invoice_model = db.execute(stmt).scalars().first()
 
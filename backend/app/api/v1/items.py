@@ -1,13 +1,17 @@
+import json
 import logging
-from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException, Path
+from typing import Annotated, Optional
+from fastapi import APIRouter, Depends, HTTPException, Path, Response
 from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, selectinload
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from starlette import status
 from app.core.security import check_permissions, get_current_user
 from app.db.models.item import Item
+from app.db.async_base import get_async_db
 from app.db.base import get_db
+from app.db.loader_options import loader_options
 from app.schemas.item import (
     ItemCreateRequest,
     ItemReadRequest,
@@ -18,12 +22,17 @@ from app.db.models.rbac import User
 from app.db.models.item_category import ItemCategory
 from app.db.models.unit_of_measure import UnitOfMeasure
 from app.db.models.vendor import Vendor
+from app.services.item_cache import item_cache
 
 
 router = APIRouter(prefix="/items", tags=["Items"])
 
+# Async versions of the hot endpoints, included ahead of `router` when DB_ASYNC_ROUTES is set
+async_router = APIRouter(prefix="/items", tags=["Items"])
+
 
 db_dependency = Annotated[Session, Depends(get_db)]
+async_db_dependency = Annotated[AsyncSession, Depends(get_async_db)]
 
 
 @router.post(
@@ -223,6 +232,42 @@ def read_all_items(db: db_dependency):
         )
 
 
+@async_router.get(
+    "/",
+    response_model=list[ItemReadRequest],
+    status_code=status.HTTP_200_OK,
+)
+async def read_all_items_async(db: async_db_dependency):
+    """
+    Async version of `read_all_items`, served instead of it when `DB_ASYNC_ROUTES` is set.
+    The relationships of the read schema are loaded with the items, serializing the response
+    must not lazy load outside of the session.
+    """
+
+    try:
+        stmt = select(Item).options(*loader_options(ItemReadRequest))
+
+        result = (await db.execute(stmt)).scalars().all()
+
+        return result
+
+    except IntegrityError as e:
+        logging.error(f"Integrity error occurred: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e.orig))
+    except SQLAlchemyError as e:
+        logging.error(f"Database error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An error occurred while fetching all items.",
+        )
+    except Exception as e:
+        logging.error(f"Unexpected error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An error occurred while fetching all items.",
+        )
+
+
 @router.get(
     "/id/{item_id}",
     response_model=ItemReadRequest,
@@ -279,6 +324,41 @@ def read_item_by_id(db: db_dependency, item_id: int = Path(gt=0)):
         )
 
 
+def _read_item_cached(db: Session, kind: str, value: str, condition) -> Optional[Response]:
+    """
+    Serve an item lookup from the item cache, loading and caching it on a miss. The stock is
+    read fresh on a hit, it may have been changed by another worker.
+    Returns None if no item matches.
+    """
+    cached = item_cache.get(kind, value)
+    if cached is not None:
+        item_id, payload = cached
+        quantity = db.execute(
+            select(Item.quantity).where(Item.item_id == item_id)
+        ).scalar_one_or_none()
+        if quantity is None:
+            # Deleted by another worker
+            item_cache.invalidate([item_id])
+            cached = None
+        else:
+            payload = {**payload, "quantity": quantity}
+
+    if cached is None:
+        stmt = (
+            select(Item)
+            .where(condition)
+            .order_by(Item.item_id)  # Codes and barcodes are not unique, the oldest item wins
+            .options(*loader_options(ItemReadRequest))
+        )
+        item_model = db.execute(stmt).scalars().first()
+        if item_model is None:
+            return None
+        payload = ItemReadRequest.model_validate(item_model).model_dump(mode="json")
+        item_cache.put(kind, value, item_model.item_id, payload)
+
+    return Response(content=json.dumps(payload), media_type="application/json")
+
+
 @router.get(
     "/barcode/{item_barcode}",
     response_model=ItemReadRequest,
@@ -290,7 +370,8 @@ def read_item_by_barcode(
     item_barcode: str = Path(..., min_length=1, max_length=12, regex=r"^\d+$"),
 ):
     """
-    Fetch a item record by its ID.
+    Fetch a item record by its barcode. Served from the in-memory item cache when possible,
+    a cache hit only reads the stock by primary key.
     Args:
 
         item_barcode (str): The barcode of the item to fetch. Must be a string of digits with a length between 1 and 12.
@@ -304,16 +385,17 @@ def read_item_by_barcode(
     """
 
     try:
-        stmt = select(Item).where(Item.barcode == item_barcode)
-        item_model = db.execute(stmt).scalars().first()
+        response = _read_item_cached(
+            db, "barcode", item_barcode, Item.barcode == item_barcode
+        )
 
-        if item_model is None:
+        if response is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"item with barcode {item_barcode} not found.",
             )
 
-        return item_model
+        return response
 
     except IntegrityError as e:
         logging.error(f"Integrity error occurred: {str(e)}")
@@ -338,6 +420,114 @@ def read_item_by_barcode(
         )
 
 
+@async_router.get(
+    "/barcode/{item_barcode}",
+    response_model=ItemReadRequest,
+    status_code=status.HTTP_200_OK,
+)
+async def read_item_by_barcode_async(
+    db: async_db_dependency,
+    item_barcode: str = Path(..., min_length=1, max_length=12, regex=r"^\d+$"),
+):
+    """
+    Async version of `read_item_by_barcode`, served instead of it when `DB_ASYNC_ROUTES` is set.
+    """
+
+    try:
+        response = await db.run_sync(
+            _read_item_cached, "barcode", item_barcode, Item.barcode == item_barcode
+        )
+
+        if response is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"item with barcode {item_barcode} not found.",
+            )
+
+        return response
+
+    except IntegrityError as e:
+        logging.error(f"Integrity error occurred: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e.orig))
+    except SQLAlchemyError as e:
+        logging.error(f"Database error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred while fetching the item with barcode {item_barcode}.",
+        )
+    except HTTPException as e:
+        logging.error(f"HTTPException: {str(e)}")
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.detail,
+        )
+    except Exception as e:
+        logging.error(f"Unexpected error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred while fetching the item with barcode {item_barcode}.",
+        )
+
+
+@router.get(
+    "/code/{item_code}",
+    response_model=ItemReadRequest,
+    status_code=status.HTTP_200_OK,
+    # dependencies=[Depends(check_permissions("super user permission"))],
+)
+def read_item_by_code(
+    db: db_dependency,
+    item_code: str = Path(..., min_length=1, max_length=20),
+):
+    """
+    Fetch a item record by its item code, e.g. the product number printed on an invoice.
+    Served from the in-memory item cache when possible, a cache hit only reads the stock by primary key.
+    Args:
+
+        item_code (str): The item code of the item to fetch.
+    Returns:
+
+        Item: The item model if found.
+    Raises:
+
+        HTTPException: If the item is not found (404), if there is an integrity error (400),
+                       or if there is a general database error (500) or if an unexpected error occurs during the operation (500).
+    """
+
+    try:
+        response = _read_item_cached(db, "code", item_code, Item.item_code == item_code)
+
+        if response is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"item with item_code {item_code} not found.",
+            )
+
+        return response
+
+    except IntegrityError as e:
+        logging.error(f"Integrity error occurred: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e.orig))
+    except SQLAlchemyError as e:
+        logging.error(f"Database error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred while fetching the item with item_code {item_code}.",
+        )
+    except HTTPException as e:
+        logging.error(f"HTTPException: {str(e)}")
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.detail,
+        )
+    except Exception as e:
+        logging.error(f"Unexpected error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred while fetching the item with item_code {item_code}.",
+        )
+
+
 @router.put(
     "/{item_id}",
     response_model=ItemReadRequest,
@@ -383,6 +573,7 @@ def update_item(
 
         for key, value in update_data.items():
             setattr(item_model, key, value)  # Dynamically update the fields
+        item_cache.invalidate_on_commit(db, [item_id])
         db.commit()
         db.refresh(item_model)  # Refresh the updated instance
         return item_model  # Return the updated model
@@ -440,6 +631,7 @@ def delete_item(db: db_dependency, item_id: int = Path(gt=0)):
 
         stmt = delete(Item).where(Item.item_id == item_id)
         db.execute(stmt)
+        item_cache.invalidate_on_commit(db, [item_id])
         db.commit()
 
     except IntegrityError as e:
@@ -8,6 +8,8 @@ from starlette import status
 from app.core.security import check_permissions, get_current_user
 from app.db.models.rbac import Permission
 from app.db.base import get_db
+from app.services.permission_cache import permission_cache
+from app.services.permission_registry import permission_registry
 from app.schemas.permission import (
     PermissionCreateRequest,
     PermissionReadRequest,
@@ -55,6 +57,7 @@ def create_permission(db: db_dependency, permission_request: PermissionCreateReq
         )  # create a new instance of a model that is not yet added to the session
 
         db.commit()
+        permission_registry.invalidate()  # Bit positions are derived from the permissions table
         db.refresh(permission_model)  # Refresh the new instance
 
         return permission_model
@@ -220,6 +223,8 @@ def update_permission(
         for key, value in update_data.items():
             setattr(permission_model, key, value)  # Dynamically update the fields
         db.commit()
+        permission_cache.clear()
+        permission_registry.invalidate()
         db.refresh(permission_model)  # Refresh the updated instance
         return permission_model  # Return the updated permission model
 
@@ -277,6 +282,8 @@ def delete_permission(db: db_dependency, permission_id: int = Path(gt=0)):
         stmt = delete(Permission).where(Permission.permission_id == permission_id)
         db.execute(stmt)
         db.commit()
+        permission_cache.clear()
+        permission_registry.invalidate()
 
     except IntegrityError as e:
         logging.error(f"Integrity error occurred: {str(e)}")
@@ -8,6 +8,8 @@ from starlette import status
 from app.core.security import check_permissions, get_current_user
 from app.db.models.rbac import Permission, Role
 from app.db.base import get_db
+from app.services.permission_cache import permission_cache
+from app.services.permission_registry import permission_registry
 from app.schemas.role import RoleCreateRequest, RoleReadRequest, RoleUpdateRequest
 
 
@@ -219,6 +221,8 @@ def update_role(
             setattr(role_model, key, value)  # Dynamically update the fields
 
         db.commit()
+        permission_cache.clear()
+        permission_registry.invalidate()
         db.refresh(role_model)  # Refresh the updated instance
         return role_model  # Return the updated role model
 
@@ -277,6 +281,8 @@ def delete_role(db: db_dependency, role_id: int = Path(gt=0)):
         stmt = delete(Role).where(Role.role_id == role_id)
         db.execute(stmt)
         db.commit()
+        permission_cache.clear()
+        permission_registry.invalidate()
 
     except IntegrityError as e:
         logging.error(f"Integrity error occurred: {str(e.orig)}")
@@ -373,6 +379,8 @@ def assign_permissions(
                 # this auto maps the models then add records to RolePermission table
                 role_model.permissions.append(perm)
         db.commit()
+        permission_cache.clear()
+        permission_registry.invalidate()
         db.refresh(role_model)  # Refresh the new instance
         return role_model
 
@@ -467,6 +475,8 @@ def revoke_permissions(
                 # this auto maps the models then add records to RolePermission table
                 role_model.permissions.remove(perm)
         db.commit()
+        permission_cache.clear()
+        permission_registry.invalidate()
         db.refresh(role_model)  # Refresh the new instance
         return role_model
 
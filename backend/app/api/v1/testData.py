@@ -18,6 +18,7 @@ from app.schemas.role import (
 )
 from app.schemas.user import UserCreateRequest, UserReadRequest
 from app.core.config import settings
+from app.core.password_hasher import password_hasher
 from app.db.models.department import Department
 from app.schemas.department import (
     DepartmentCreateRequest,
@@ -258,10 +259,14 @@ def create_users(db: db_dependency, user_request: list[UserCreateRequest]):
     """
     try:
 
-        for user in user_request:
+        # Hash the whole batch on the password hasher pool
+        hashed_passwords = password_hasher.hash_many(
+            [user.password for user in user_request]
+        )
+        for user, hashed_password in zip(user_request, hashed_passwords):
             user_model = User(
                 user_name=user.user_name,
-                hashed_password=settings.bcrypt_context.hash(user.password),
+                hashed_password=hashed_password,
                 employee_id=user.employee_id,
             )
 
@@ -1,30 +1,67 @@
+import csv
+import io
+import json
 import logging
-from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException, Path
-from sqlalchemy import select
-from sqlalchemy.orm import Session, selectinload
+from datetime import datetime
+from typing import Annotated, Literal, Optional
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    Header,
+    HTTPException,
+    Path,
+    Query,
+    Response,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from starlette import status
-from app.db.base import get_db
+from app.core.config import settings
+from app.core.pagination import (
+    NEXT_CURSOR_HEADER,
+    decode_cursor,
+    encode_cursor,
+    server_timestamp,
+)
+from app.db.async_base import get_async_db
+from app.db.base import get_db, session_factory_for
+from app.db.loader_options import loader_options
 from app.schemas.checkout_transaction import (
+    CheckoutTransactionBatchReadRequest,
     CheckoutTransactionCreateRequest,
     CheckoutTransactionReadRequest,
 )
+from app.db.models.checkout_item import CheckoutItem
+from app.db.models.checkout_transaction import CheckoutTransaction
 from app.db.models.department import Department
 from app.db.models.employee import Employee
 from app.db.models.item import Item
-
-from app.db.models.checkout_transaction import CheckoutTransaction
-from app.db.models.checkout_item import CheckoutItem
 from app.db.models.item_category import ItemCategory
 from app.db.models.unit_of_measure import UnitOfMeasure
-from app.db.models.inventory_adjustment_log import InventoryAdjustmentLog
+from app.services.checkout_service import CheckoutService
+from app.services.idempotency_service import (
+    PARTIAL_RESPONSE_STATUS,
+    IdempotencyService,
+)
 
 
 db_dependency = Annotated[Session, Depends(get_db)]
+async_db_dependency = Annotated[AsyncSession, Depends(get_async_db)]
+session_factory_dependency = Annotated[sessionmaker, Depends(session_factory_for)]
 
 router = APIRouter(prefix="/transactions", tags=["Inventory Checkout"])
 
+# Async versions of the hot endpoints, included ahead of `router` when DB_ASYNC_ROUTES is set
+async_router = APIRouter(prefix="/transactions", tags=["Inventory Checkout"])
+
+# Scope of the Idempotency-Key header accepted by the POST endpoint
+IDEMPOTENCY_ENDPOINT = "POST /transactions/"
+BATCH_IDEMPOTENCY_ENDPOINT = "POST /transactions/batch"
+
 
 @router.post(
     "/",
@@ -32,7 +69,9 @@ router = APIRouter(prefix="/transactions", tags=["Inventory Checkout"])
     # dependencies=[Depends(check_permissions("super user permission"))],
 )
 def process_checkout(
-    db: db_dependency, transaction_request: CheckoutTransactionCreateRequest
+    db: db_dependency,
+    transaction_request: CheckoutTransactionCreateRequest,
+    idempotency_key: Annotated[Optional[str], Header(max_length=255)] = None,
 ):
     """
     Processes a checkout transaction by validating the employee, department, and items,
@@ -57,6 +96,8 @@ def process_checkout(
             #         }
             #     ]
             # }
+        idempotency_key (str, optional): The `Idempotency-Key` header. A retried request with the same key
+            gets the stored response back without being processed again.
     Raises:
 
         HTTPException:
@@ -71,159 +112,207 @@ def process_checkout(
             the transaction ID and creation timestamp.
     """
 
-    # Example Transaction:
-    # {
-    #     "employee_id": 123,
-    #     "department_id": 2,
-    #     "checkout_items": [
-    #         {
-    #         "item_id": 456,
-    #         "quantity": 2
-    #         },
-    #         {
-    #         "item_id": 789,
-    #         "quantity": 1
-    #         }
-    #     ]
-    # }
-    try:
-        # Check if the employee and department exist
-        models_to_check = [
-            (
-                Employee,
-                Employee.employee_id,
-                transaction_request.employee_id,
-                "employee",
-            ),
-            (
-                Department,
-                Department.department_id,
-                transaction_request.department_id,
-                "department",
-            ),
-        ]
+    return _process_checkout(db, transaction_request, idempotency_key)
 
-        for model, field, value, name in models_to_check:
-            stmt = select(model).where(field == value)
-            result = db.execute(stmt).scalars().first()
-            if result is None:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"{name.capitalize()} with id {value} not found.",
-                )
 
-        # Validate the list of checkout items
-        for item in transaction_request.checkout_items:
-            stmt = select(
-                Item.item_id,
-                Item.name,
-                Item.category,
-                Item.unit_of_measure,
-                Item.quantity,
-            ).where(Item.item_id == item.item_id)
-            result = db.execute(stmt).fetchone()
-            if result is None:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Item with id {item.item_id} not found.",
-                )
+@async_router.post("/", status_code=status.HTTP_201_CREATED)
+async def process_checkout_async(
+    db: async_db_dependency,
+    transaction_request: CheckoutTransactionCreateRequest,
+    idempotency_key: Annotated[Optional[str], Header(max_length=255)] = None,
+):
+    """
+    Async version of `process_checkout`, served instead of it when `DB_ASYNC_ROUTES` is set.
+    The checkout runs on an AsyncSession and waits for the database without holding a
+    worker thread.
+    """
+    return await db.run_sync(_process_checkout, transaction_request, idempotency_key)
 
-            # Check if the item has enough quantity
-            if result.quantity < item.quantity:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Item {result.name} has only {result.quantity} in stock.",
-                )
 
-            # Retrieve the category and unit of measure for the item
-            stmt = select(ItemCategory.category_id).where(
-                ItemCategory.category_id == result.category
+def _process_checkout(
+    db: Session,
+    transaction_request: CheckoutTransactionCreateRequest,
+    idempotency_key: Optional[str],
+):
+    try:
+        if idempotency_key:
+            request_hash = IdempotencyService.request_hash(transaction_request)
+            stored_response = IdempotencyService.get_stored_response(
+                db, IDEMPOTENCY_ENDPOINT, idempotency_key, request_hash
             )
-            category = db.execute(stmt).scalars().first()
+            if stored_response is not None:
+                return stored_response
 
-            stmt = select(UnitOfMeasure.uom_id).where(
-                UnitOfMeasure.uom_id == result.unit_of_measure
-            )
-            uom = db.execute(stmt).scalars().first()
-            print(item.item_id, category, uom)
-            # # Add retrieved category and unit of measure to the item
-            # item.category_id = category
-            # item.unit_of_measure = uom
-            print("Item after adding category and uom ", item)
-
-        # Create the checkout transaction
-        new_transaction = CheckoutTransaction(
-            employee_id=transaction_request.employee_id,
-            department_id=transaction_request.department_id,
-            total_items=len(transaction_request.checkout_items),
-        )
-        db.add(new_transaction)
-        db.flush()  # Writes to the database to generate `transaction_id` but doesn't commit
-        print("new_transaction.transaction_id ", new_transaction.transaction_id)
-        # Create the checkout items
-        for index, item in enumerate(transaction_request.checkout_items):
-            print("CheckoutItem ", item)
-            checkout_item = CheckoutItem(
-                transaction_id=new_transaction.transaction_id,
-                line_number=index + 1,
-                item_id=item.item_id,
-                quantity=item.quantity,
-                category_id=category,
-                unit_of_measure=uom,
+        transaction_id = CheckoutService.process(db, transaction_request)
+        response = {
+            "message": "Checkout processed successfully",
+            "transaction": transaction_id,
+        }
+
+        if idempotency_key:
+            IdempotencyService.store_response(
+                db,
+                IDEMPOTENCY_ENDPOINT,
+                idempotency_key,
+                request_hash,
+                status.HTTP_201_CREATED,
+                response,
             )
-            db.add(checkout_item)
+        db.commit()  # Commit the transaction, all lines and the stock adjustments at once
 
-        db.commit()  # Commit the transaction and all lines
-        print("Did go here!!!!")
-        # The transaction is committed, so we can now fetch the transaction and checkout items
-        stmt = select(CheckoutTransaction).where(
-            CheckoutTransaction.transaction_id == new_transaction.transaction_id
-        )
-        checkout_transaction_result = db.execute(stmt).scalars().first()
-        checkout_transaction_result_id = checkout_transaction_result.transaction_id
-        print("checkout_transaction_result ", checkout_transaction_result_id)
-        # After the transaction is committed, we need to update the quantity of the items accordingly
-        if checkout_transaction_result is None:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to fetch the committed transaction.",
+        if idempotency_key:
+            IdempotencyService.purge_expired(db)
+
+        return response
+
+    except IntegrityError as e:
+        db.rollback()
+        if idempotency_key:
+            # A concurrent retry with the same key committed first, answer with its response
+            stored_response = IdempotencyService.get_stored_response(
+                db, IDEMPOTENCY_ENDPOINT, idempotency_key, request_hash
             )
+            if stored_response is not None:
+                return stored_response
+        logging.error(f"Integrity error occurred: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e.orig))
+    except SQLAlchemyError as e:
+        logging.error(f"Database error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An error occurred while processing the checkout.",
+        )
+    except HTTPException as e:
+        logging.error(f"HTTPException: {str(e)}")
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.detail,
+        )
+    except Exception as e:
+        logging.error(f"Unexpected error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An error occurred while processing the checkout.",
+        )
+
+
+@router.post(
+    "/batch",
+    response_model=list[CheckoutTransactionBatchReadRequest],
+    status_code=status.HTTP_200_OK,
+    # dependencies=[Depends(check_permissions("super user permission"))],
+)
+def process_checkout_batch(
+    db: db_dependency,
+    transaction_requests: Annotated[
+        list[CheckoutTransactionCreateRequest], Body(min_length=1)
+    ],
+    chunk_size: Optional[int] = Query(None, gt=0),
+    idempotency_key: Annotated[Optional[str], Header(max_length=255)] = None,
+):
+    """
+    Processes a batch of queued checkout transactions, e.g. flushed by an offline kiosk on reconnect.
+    Employees, departments and items are validated with shared lookups for the whole batch.
+    Args:
 
-        for item in checkout_transaction_result.checkout_items:
-            stmt = select(Item).where(Item.item_id == item.item_id)
-            result = db.execute(stmt).scalars().first()
-            if result:
-                old_value = result.quantity
-                new_value = result.quantity - item.quantity
-                result.quantity = new_value
-                # log the inventory adjustment in the database
-                inventory_adjustment_log = InventoryAdjustmentLog(
-                    item_id=item.item_id,
-                    old_quantity=old_value,
-                    new_quantity=new_value,
-                    quantity_changed=item.quantity,
-                    adjustment_type="checkout",
-                    scanned_invoice_item_id=None,
-                    checkout_item_id=item.checkout_item_id,
+        transaction_requests (list[CheckoutTransactionCreateRequest]): The queued checkouts, each in
+            the same format as the body of `POST /transactions/`.
+        chunk_size (int, optional): Commit every `chunk_size` checkouts. By default the whole batch
+            is processed in a single database transaction.
+        idempotency_key (str, optional): The `Idempotency-Key` header. A retried batch with the same key
+            gets the stored results back without being processed again. When an earlier attempt failed
+            after committing some chunks, the retry resumes after them.
+    Raises:
+
+        HTTPException:
+        - If the key was already used with a different batch, or is being processed by another request.
+        - If there is a general database error during the batch, the uncommitted checkouts are rolled back.
+        - If there is an unexpected error during the batch.
+    Returns:
+
+        list[CheckoutTransactionBatchReadRequest]: One result per checkout in request order, with the
+            transaction ID of processed checkouts or the error detail of rejected ones.
+    """
+
+    try:
+        results = []
+        stored_body = None
+        if idempotency_key:
+            request_hash = IdempotencyService.request_hash_many(transaction_requests)
+            stored = IdempotencyService.get_stored_key(
+                db, BATCH_IDEMPOTENCY_ENDPOINT, idempotency_key, request_hash
+            )
+            if stored is not None:
+                if stored.status_code != PARTIAL_RESPONSE_STATUS:
+                    return IdempotencyService.replay(stored)
+                # An earlier attempt committed some chunks before failing, resume after them
+                results = json.loads(stored.response_body)
+                stored_body = stored.response_body
+
+        def store_results(results: list[dict], status_code: int) -> None:
+            # Stored in the transaction of the checkouts they describe
+            nonlocal stored_body
+            if stored_body is None:
+                IdempotencyService.store_response(
+                    db,
+                    BATCH_IDEMPOTENCY_ENDPOINT,
+                    idempotency_key,
+                    request_hash,
+                    status_code,
+                    results,
+                )
+                stored_body = json.dumps(results)
+            else:
+                stored_body = IdempotencyService.update_response(
+                    db,
+                    BATCH_IDEMPOTENCY_ENDPOINT,
+                    idempotency_key,
+                    stored_body,
+                    status_code,
+                    results,
                 )
-                db.add(inventory_adjustment_log)
 
-        # commit the changes to the database
-        db.commit()
+        results = CheckoutService.process_batch(
+            db,
+            transaction_requests,
+            chunk_size,
+            results,
+            checkpoint=(
+                (lambda partial: store_results(partial, PARTIAL_RESPONSE_STATUS))
+                if idempotency_key
+                else None
+            ),
+        )
+        if idempotency_key:
+            store_results(results, status.HTTP_200_OK)
+        db.commit()  # Commit the remaining checkouts of the batch
+
+        if idempotency_key:
+            IdempotencyService.purge_expired(db)
 
-        return {
-            "message": "Checkout processed successfully",
-            "transaction": checkout_transaction_result_id,
-        }
+        return results
 
     except IntegrityError as e:
+        db.rollback()
+        if idempotency_key:
+            # A concurrent attempt with the same key stored its results first
+            stored = IdempotencyService.get_stored_key(
+                db, BATCH_IDEMPOTENCY_ENDPOINT, idempotency_key, request_hash
+            )
+            if stored is not None:
+                if stored.status_code != PARTIAL_RESPONSE_STATUS:
+                    return IdempotencyService.replay(stored)
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"Idempotency-Key {idempotency_key} is being processed by another request.",
+                )
         logging.error(f"Integrity error occurred: {str(e)}")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e.orig))
     except SQLAlchemyError as e:
         logging.error(f"Database error: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="An error occurred while processing the checkout.",
+            detail="An error occurred while processing the checkout batch.",
         )
     except HTTPException as e:
         logging.error(f"HTTPException: {str(e)}")
@@ -235,7 +324,7 @@ def process_checkout(
         logging.error(f"Unexpected error: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="An error occurred while processing the checkout.",
+            detail="An error occurred while processing the checkout batch.",
         )
 
 
@@ -245,28 +334,89 @@ def process_checkout(
     status_code=status.HTTP_200_OK,
     # dependencies=[Depends(check_permissions("super user permission"))],
 )
-def read_all_transactions(db: db_dependency):
+def read_all_transactions(
+    db: db_dependency,
+    response: Response,
+    limit: Optional[int] = Query(None, gt=0, le=settings.PAGE_SIZE_MAX),
+    cursor: Optional[str] = Query(None),
+    employee_id: Optional[int] = Query(None, gt=0),
+    department_id: Optional[int] = Query(None, gt=0),
+    item_id: Optional[int] = Query(None, gt=0),
+    date_from: Optional[datetime] = Query(None, alias="from"),
+    date_to: Optional[datetime] = Query(None, alias="to"),
+):
     """
-    Fetch all transactions from the database along with their associated permissions.
+    Fetch the transactions from the database along with their associated items, newest first.
+
+    Pagination is keyset based on (created_at, transaction_id) and starts when `limit` or `cursor` is
+    passed: when more transactions are available, the `X-Next-Cursor` response header holds the cursor
+    to pass to fetch the next page. Without either, all matching transactions are returned.
 
     Args:
 
-        None
+        limit (int, optional): The maximum number of transactions to return, PAGE_SIZE_DEFAULT when
+                               only a cursor is passed.
+        cursor (str, optional): The `X-Next-Cursor` header of the previous page.
+        employee_id (int, optional): Only return the transactions of this employee.
+        department_id (int, optional): Only return the transactions of this department.
+        item_id (int, optional): Only return the transactions containing this item.
+        from (datetime, optional): Only return the transactions created at or after this time.
+        to (datetime, optional): Only return the transactions created before this time.
     Returns:
 
         list[CheckoutTransaction]: A list of CheckoutTransaction objects with their associated items.
     Raises:
 
-        HTTPException: If an integrity error or any other database error occurs,
+        HTTPException: If the cursor is invalid, or if an integrity error or any other database error occurs,
                        an HTTPException is raised with an appropriate status code
                        and error message.
     """
     try:
         stmt = select(CheckoutTransaction).options(
-            selectinload(CheckoutTransaction.checkout_items)
+            *loader_options(CheckoutTransactionReadRequest)
+        )
+
+        if employee_id is not None:
+            stmt = stmt.where(CheckoutTransaction.employee_id == employee_id)
+        if department_id is not None:
+            stmt = stmt.where(CheckoutTransaction.department_id == department_id)
+        if item_id is not None:
+            stmt = stmt.where(
+                select(CheckoutItem.checkout_item_id)
+                .where(
+                    CheckoutItem.item_id == item_id,
+                    CheckoutItem.transaction_id == CheckoutTransaction.transaction_id,
+                )
+                .exists()
+            )
+        if date_from is not None:
+            stmt = stmt.where(CheckoutTransaction.created_at >= server_timestamp(date_from))
+        if date_to is not None:
+            stmt = stmt.where(CheckoutTransaction.created_at < server_timestamp(date_to))
+        if cursor is not None:
+            # Seek past the last row of the previous page instead of using an OFFSET
+            created_at, transaction_id = decode_cursor(cursor)
+            stmt = stmt.where(
+                tuple_(CheckoutTransaction.created_at, CheckoutTransaction.transaction_id)
+                < tuple_(server_timestamp(created_at), transaction_id)
+            )
+
+        stmt = stmt.order_by(
+            CheckoutTransaction.created_at.desc(),
+            CheckoutTransaction.transaction_id.desc(),
         )
+        if limit is None and cursor is not None:
+            limit = settings.PAGE_SIZE_DEFAULT
+        if limit is not None:
+            stmt = stmt.limit(limit + 1)  # One extra row tells whether there is a next page
         result = db.execute(stmt).scalars().all()
 
+        if limit is not None and len(result) > limit:
+            result = result[:limit]
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+                result[-1].created_at, result[-1].transaction_id
+            )
+
         return result
 
     except IntegrityError as e:
@@ -278,6 +428,12 @@ def read_all_transactions(db: db_dependency):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An error occurred while fetching all transactions.",
         )
+    except HTTPException as e:
+        logging.error(f"HTTPException: {str(e)}")
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.detail,
+        )
     except Exception as e:
         logging.error(f"Unexpected error: {str(e)}")
         raise HTTPException(
@@ -286,6 +442,134 @@ def read_all_transactions(db: db_dependency):
         )
 
 
+# Columns of the flattened export, one row per checkout line
+EXPORT_COLUMNS = (
+    CheckoutTransaction.transaction_id,
+    CheckoutTransaction.created_at,
+    CheckoutItem.line_number,
+    CheckoutItem.item_id,
+    Item.item_code,
+    Item.name.label("item_name"),
+    CheckoutItem.quantity,
+    CheckoutItem.category_id,
+    ItemCategory.name.label("category_name"),
+    CheckoutItem.unit_of_measure.label("uom_id"),
+    UnitOfMeasure.abbreviation.label("uom_abbreviation"),
+    CheckoutTransaction.employee_id,
+    Employee.employee_number,
+    Employee.first_name.label("employee_first_name"),
+    Employee.last_name.label("employee_last_name"),
+    CheckoutTransaction.department_id,
+    Department.name.label("department_name"),
+)
+
+# Number of rows fetched from the server-side cursor and written to the response at a time
+EXPORT_BATCH_SIZE = 1000
+
+
+def _export_rows(
+    session_factory: sessionmaker,
+    export_format: str,
+    date_from: Optional[datetime],
+    date_to: Optional[datetime],
+):
+    """
+    Stream the flattened checkout lines in batches of encoded rows.
+
+    The dependency session is closed before a streaming response is sent, so the generator
+    owns its session, opened on the read replica when one serves the request. Rows are fetched from a server-side cursor and written out batch by
+    batch, memory stays constant whatever the date range.
+
+    Raises:
+
+        SQLAlchemyError: If the export fails midway. The status line is already sent, re-raising
+                         makes the server abort the response instead of ending it cleanly.
+    """
+    stmt = (
+        select(*EXPORT_COLUMNS)
+        .join(CheckoutItem.transaction)
+        .join(CheckoutItem.item)
+        .join(CheckoutItem.category)
+        .join(CheckoutItem.uom)
+        .join(CheckoutTransaction.employee)
+        .join(CheckoutTransaction.department)
+        .order_by(
+            CheckoutTransaction.created_at,
+            CheckoutTransaction.transaction_id,
+            CheckoutItem.line_number,
+        )
+        .execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE)
+    )
+    if date_from is not None:
+        stmt = stmt.where(CheckoutTransaction.created_at >= server_timestamp(date_from))
+    if date_to is not None:
+        stmt = stmt.where(CheckoutTransaction.created_at < server_timestamp(date_to))
+
+    header = [column.key for column in EXPORT_COLUMNS]
+    with session_factory() as db:
+        try:
+            result = db.execute(stmt)
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            if export_format == "csv":
+                writer.writerow(header)
+
+            for partition in result.partitions():
+                for row in partition:
+                    if export_format == "csv":
+                        writer.writerow(row)
+                    else:
+                        buffer.write(
+                            json.dumps(dict(zip(header, row)), default=str) + "\n"
+                        )
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+
+            if buffer.tell():
+                yield buffer.getvalue()  # CSV header of an empty export
+
+        except SQLAlchemyError as e:
+            # The status line is already sent, an aborted response is the only signal left to the client
+            logging.error(f"Database error while exporting transactions: {str(e)}")
+            raise
+
+
+@router.get(
+    "/export",
+    status_code=status.HTTP_200_OK,
+    # dependencies=[Depends(check_permissions("super user permission"))],
+)
+def export_transactions(
+    session_factory: session_factory_dependency,
+    export_format: Literal["csv", "ndjson"] = Query("csv", alias="format"),
+    date_from: Optional[datetime] = Query(None, alias="from"),
+    date_to: Optional[datetime] = Query(None, alias="to"),
+):
+    """
+    Export the checkout lines of all transactions, e.g. for monthly consumption reports.
+    Each row is one checkout line flattened with its transaction, item, category, unit of
+    measure, employee and department. The response is streamed so that memory stays constant
+    whatever the date range.
+    Args:
+
+        format (str): `csv` (default) or `ndjson`, one JSON object per line.
+        from (datetime, optional): Only export the transactions created at or after this time.
+        to (datetime, optional): Only export the transactions created before this time.
+    Returns:
+
+        StreamingResponse: The exported rows ordered by transaction creation time and line number.
+    """
+    media_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        _export_rows(session_factory, export_format, date_from, date_to),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="transactions.{export_format}"'
+        },
+    )
+
+
 @router.get(
     "/{transaction_id}",
     response_model=CheckoutTransactionReadRequest,
@@ -308,8 +592,10 @@ def read_transaction(db: db_dependency, transaction_id: int = Path(gt=0)):
     """
 
     try:
-        stmt = select(CheckoutTransaction).where(
-            CheckoutTransaction.transaction_id == transaction_id
+        stmt = (
+            select(CheckoutTransaction)
+            .options(*loader_options(CheckoutTransactionReadRequest))
+            .where(CheckoutTransaction.transaction_id == transaction_id)
         )
         transaction_model = db.execute(stmt).scalars().first()
 
@@ -6,9 +6,16 @@ from sqlalchemy.orm import Session, selectinload
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from starlette import status
 from app.core.config import settings
+from app.core.password_hasher import password_hasher
 from app.core.security import check_permissions, get_current_user
 from app.db.models.rbac import Role, User
+from app.db.models.refresh_token import RefreshToken
 from app.db.base import get_db
+from app.services.permission_cache import permission_cache
+from app.services.refresh_token_service import RefreshTokenService
+from app.services.revocation_list import revocation_list
+from app.services.token_cache import token_cache
+from app.services.user_service import UserService
 from app.schemas.user import UserCreateRequest, UserReadRequest, UserUpdateRequest
 from app.schemas import employee
 
@@ -47,7 +54,7 @@ def create_user(db: db_dependency, user_request: UserCreateRequest):
         # with db.begin():  # Automatically commits or rolls back on exit
         user_model = User(
             user_name=user_request.user_name,
-            hashed_password=settings.bcrypt_context.hash(user_request.password),
+            hashed_password=password_hasher.hash(user_request.password),
             employee_id=user_request.employee_id,
         )
 
@@ -220,10 +227,20 @@ def update_user(
             exclude_unset=True
         )  # Only get the provided fields
 
+        password = update_data.pop("password", None)
+        if password is not None:
+            UserService.set_password(user_model, password)
+
+        # Disabling a user or resetting its password ends all of its sessions
+        if password is not None or update_data.get("enabled") is False:
+            revocation_list.revoke_user(db, user_id)
+            RefreshTokenService.revoke_user(db, user_id)
+
         for key, value in update_data.items():
             setattr(user_model, key, value)  # Dynamically update the fields
 
         db.commit()
+        token_cache.invalidate_user(user_id)  # A disabled or renamed user must not resolve from the cache
         db.refresh(user_model)  # Refresh the updated instance
         return user_model  # Return the updated user model
 
@@ -277,9 +294,16 @@ def delete_user(db: db_dependency, user_id: int = Path(gt=0)):
                 detail=f"User with id {user_id} not found.",
             )
 
+        # Refresh tokens belong to the user, drop them first to satisfy the foreign key
+        stmt = delete(RefreshToken).where(RefreshToken.user_id == user_id)
+        db.execute(stmt)
+        revocation_list.revoke_user(db, user_id)
+
         stmt = delete(User).where(User.user_id == user_id)
         db.execute(stmt)
         db.commit()
+        token_cache.invalidate_user(user_id)
+        permission_cache.invalidate_user(user_id)
 
     except IntegrityError as e:
         logging.error(f"Integrity error occurred: {str(e)}")
@@ -374,6 +398,7 @@ def assign_roles(
                 user_model.roles.append(perm)
 
         db.commit()
+        permission_cache.invalidate_user(user_id)
         db.refresh(user_model)  # Refresh the new instance
         return user_model
 
@@ -464,6 +489,7 @@ def revoke_roles(
                 user_model.roles.remove(role)
 
         db.commit()
+        permission_cache.invalidate_user(user_id)
         db.refresh(user_model)  # Refresh the new instance
         return user_model
 
@@ -1,7 +1,7 @@
 import os
-from typing import Any
+from functools import cached_property
+from typing import Any, Literal
 from pydantic import (
-    PostgresDsn,
     computed_field,
     field_validator,
     model_validator,
@@ -23,72 +23,227 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
     ACCESS_TOKEN_EXPIRE_DAYS_WITH_REMEMBER_ME: int = 7
     ACCESS_TOKEN_TYPE: str = "bearer"
+    TOKEN_CACHE_MAX_ENTRIES: int = 10000  # Decoded tokens kept by get_current_user, 0 disables the cache
+
+    # Configuration for refresh tokens, access tokens issued by /auth/refresh last ACCESS_TOKEN_EXPIRE_MINUTES
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 1
+    REFRESH_TOKEN_EXPIRE_DAYS_WITH_REMEMBER_ME: int = 30
+    REFRESH_TOKEN_PURGE_INTERVAL_SECONDS: int = 300  # Expired tokens are purged at most once per interval and worker
+
+    # Configuration for access token revocation, other workers apply a logout or user disable within the interval
+    REVOCATION_SYNC_INTERVAL_SECONDS: int = 2
 
     # Configuration for password hashing
     BCRYPT_SCHEMES: list[str] = ["bcrypt"]
     DEPRECATED: str = "auto"
+    # Cost factor of new hashes, stored hashes with another cost are rehashed at the next login.
+    # Calibrate on the target host with `python -m benchmarks.bcrypt_rounds`
+    BCRYPT_ROUNDS: int = 12
+
+    # Configuration for the bounded password hasher pool, see app/core/password_hasher.py
+    PASSWORD_HASHER_EXECUTOR: Literal["thread", "process"] = "thread"
+    PASSWORD_HASHER_MAX_WORKERS: int = os.cpu_count() or 1
+    PASSWORD_HASHER_MAX_PENDING: int = 32  # Jobs queued behind the running ones before rejecting with 503
+
+    # Configuration for login throttling, see app/core/login_limiter.py. Limits apply per worker
+    # with the default in-memory store, 0 attempts per minute disables a bucket
+    LOGIN_RATE_LIMIT_USERNAME_BURST: int = 5
+    LOGIN_RATE_LIMIT_USERNAME_PER_MINUTE: int = 5
+    LOGIN_RATE_LIMIT_IP_BURST: int = 20
+    LOGIN_RATE_LIMIT_IP_PER_MINUTE: int = 30
+
+    # Configuration for idempotency keys of checkout and invoice POSTs
+    IDEMPOTENCY_KEY_TTL_HOURS: int = 24
+    IDEMPOTENCY_PURGE_INTERVAL_SECONDS: int = 300  # Expired keys are purged at most once per interval and worker
+
+    # Configuration for keyset pagination of list endpoints
+    PAGE_SIZE_DEFAULT: int = 100
+    PAGE_SIZE_MAX: int = 1000
+
+    # Configuration for the in-memory permission cache and permission registry of check_permissions
+    PERMISSION_CACHE_TTL_SECONDS: int = 60  # Bounds how long other workers keep serving revoked permissions
+
+    # Opt-in: embed role IDs and a permission bitmask in access tokens so that check_permissions
+    # needs no database access. Role assignment changes then apply from the next login.
+    STATELESS_PRINCIPAL_TOKENS: bool = False
+
+    # Configuration for the in-memory item lookup cache of barcode scans
+    ITEM_CACHE_MAX_ENTRIES: int = 10000
+    ITEM_CACHE_TTL_SECONDS: int = 300  # Bounds staleness of related category, vendor, department and uom names
+
+    # Per-request SQL statistics, see app/core/query_stats.py: a Server-Timing header with the
+    # statement count and database time of each response, and warnings for N+1 query patterns
+    QUERY_STATS_ENABLED: bool = True
+    QUERY_STATS_N_PLUS_ONE_THRESHOLD: int = 10  # Runs of one identical statement per request before warning, 0 never
 
     # You can create the instances outside the class
-    @property
+    @cached_property  # Built once, the context is reused by every hash and verification
     def bcrypt_context(self) -> CryptContext:
-        return CryptContext(schemes=self.BCRYPT_SCHEMES, deprecated=self.DEPRECATED)
+        return CryptContext(
+            schemes=self.BCRYPT_SCHEMES,
+            deprecated=self.DEPRECATED,
+            # Pinning the accepted range makes hashes of any other cost count as outdated
+            bcrypt__default_rounds=self.BCRYPT_ROUNDS,
+            bcrypt__min_rounds=self.BCRYPT_ROUNDS,
+            bcrypt__max_rounds=self.BCRYPT_ROUNDS,
+        )
 
     @property
     def oauth2_bearer(self) -> OAuth2PasswordBearer:
         return OAuth2PasswordBearer(tokenUrl="auth/token")
 
     ## SETTINGS FOR DATABASE
-    # POSTGRES_SERVER: str
-    # POSTGRES_PORT: int = 5432
-    # POSTGRES_USER: str
-    # POSTGRES_PASSWORD: str | None = None
-    # POSTGRES_PASSWORD_FILE: str | None = None
-    # POSTGRES_DB: str
-
-    # @model_validator(mode="before")
-    # @classmethod
-    # def check_postgres_password(cls, data: Any) -> Any:
-    #     if isinstance(data, dict):
-    #         if (
-    #             data.get("POSTGRES_PASSWORD_FILE") is None
-    #             and data.get("POSTGRES_PASSWORD") is None
-    #         ):
-    #             raise ValueError(
-    #                 "At least one of POSTGRES_PASSWORD_FILE and POSTGRES_PASSWORD must be set."
-    #             )
-    #     return data
-
-    # @field_validator("POSTGRES_PASSWORD_FILE")
-    # def read_password_from_file(cls, v):
-    #     if v is not None:
-    #         file_path = v
-    #         if os.path.exists(file_path):
-    #             with open(file_path, "r") as file:
-    #                 return file.read().strip()
-    #         raise ValueError(f"Password file {file_path} does not exist.")
-    #     return v
-
-    # @computed_field
-    # @property
-    # def SQLALCHEMY_DATABASE_URL(self) -> PostgresDsn:
-    #     return MultiHostUrl.build(
-    #         scheme="postgresql+psycopg",
-    #         username=self.POSTGRES_USER,
-    #         password=(
-    #             self.POSTGRES_PASSWORD
-    #             if self.POSTGRES_PASSWORD
-    #             else self.POSTGRES_PASSWORD_FILE
-    #         ),
-    #         host=self.POSTGRES_SERVER,
-    #         port=self.POSTGRES_PORT,
-    #         path=self.POSTGRES_DB,
-    #     )
-
-    # DB Connection for SQLite for local development
+    # PostgreSQL is used when POSTGRES_SERVER is set, e.g. by docker-compose, otherwise the local SQLite file
+    POSTGRES_SERVER: str | None = None
+    POSTGRES_PORT: int = 5432
+    POSTGRES_USER: str | None = None
+    POSTGRES_PASSWORD: str | None = None
+    POSTGRES_PASSWORD_FILE: str | None = None  # Replaced by the content of the file, e.g. a Docker secret
+    POSTGRES_DB: str | None = None
+
+    # Connection pool of each worker process. Every worker owns its pool, size it so that
+    #   workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) + migrations and admin sessions <= max_connections
+    # of the server (100 by default), e.g. 4 workers * (5 + 10) = 60 connections at most.
+    # Alternatively set DB_MAX_CONNECTIONS to the share of max_connections this deployment may
+    # use, every worker then caps its pool at DB_MAX_CONNECTIONS / SERVER_WORKERS.
+    DB_POOL_SIZE: int = 5  # Connections kept open
+    DB_MAX_OVERFLOW: int = 10  # Extra connections opened under load and closed when returned
+    DB_MAX_CONNECTIONS: int = 0  # Connections of all workers together, 0 for no cap
+    DB_POOL_TIMEOUT_SECONDS: int = 30  # Wait for a free connection before failing the request
+    DB_POOL_PRE_PING: bool = True  # Replace connections dropped by the server or a proxy before use
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # Reopen connections older than this, -1 never
+    DB_STATEMENT_TIMEOUT_MS: int = 30000  # PostgreSQL only, 0 disables the timeout
+
+    # Optional read replica for GET requests, see app/db/replica.py. Either a standby of the
+    # PostgreSQL server above, reached with the same credentials, or any URL, e.g.
+    # sqlite:///./replica.db as a local stand-in. It gets its own pool of the size above.
+    POSTGRES_REPLICA_SERVER: str | None = None
+    POSTGRES_REPLICA_PORT: int = 5432
+    REPLICA_DATABASE_URL: str | None = None  # Takes precedence over POSTGRES_REPLICA_SERVER
+    REPLICA_STICKY_SECONDS: int = 5  # Reads of a client stay on the primary this long after it wrote
+    REPLICA_MAX_LAG_SECONDS: int = 10  # Reads fall back to the primary beyond this replication lag
+    REPLICA_LAG_CHECK_INTERVAL_SECONDS: int = 5
+
+    # SQLite performance profile, see app/db/sqlite_profile.py: WAL, synchronous=NORMAL, foreign
+    # keys and a single in-process writer queue
+    SQLITE_PERFORMANCE_PROFILE: bool = True
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # Also bounds the wait in the writer queue
+    SQLITE_CACHE_SIZE_KB: int = 32768  # Page cache per connection
+    SQLITE_MMAP_SIZE_MB: int = 256
+
+    # Opt-in: serve the hot endpoints (checkout, invoice, barcode lookup and item list) from async
+    # routes on an AsyncSession instead of the AnyIO thread pool, see app/db/async_base.py.
+    # Requires aiosqlite for SQLite.
+    DB_ASYNC_ROUTES: bool = False
+
+    # Schema handling of each worker at startup, see app/db/startup.py:
+    #   check  - one query compares the Alembic revision of the database with the migrations and
+    #            refuses to start on a mismatch, for deployments that run `alembic upgrade head`
+    #   create - create missing tables from the models, convenient for a local SQLite file
+    #   skip   - no schema access
+    DB_STARTUP_SCHEMA: Literal["check", "create", "skip"] = "create"
+    DB_STARTUP_WARM_CONNECTIONS: int = 1  # Pool connections opened before serving, capped at DB_POOL_SIZE
+
+    # Production server, see gunicorn.conf.py for the state each worker keeps on its own
+    WEB_CONCURRENCY: int = 0  # Worker processes, 0 for one per CPU core. Always 1 on SQLite
+    SERVER_MAX_REQUESTS: int = 10000  # Restart a worker after this many requests, 0 never
+    SERVER_MAX_REQUESTS_JITTER: int = 1000  # Spreads the restarts so workers do not recycle together
+    SERVER_KEEPALIVE_SECONDS: int = 95  # Above the 90s idle timeout of Traefik towards backends
+    SERVER_BACKLOG: int = 2048  # Pending connections per listener, capped by net.core.somaxconn
+    SERVER_TIMEOUT_SECONDS: int = 60  # Kill a worker that stops responding to the arbiter
+    SERVER_GRACEFUL_TIMEOUT_SECONDS: int = 30  # In-flight requests finish within this on restart
+    # Comma separated addresses or networks of the reverse proxies in front of the server, e.g. the
+    # Traefik container. Their X-Forwarded-For and X-Forwarded-Proto headers are trusted, so that
+    # request.client is the real client, which the login limiter and the replica router key on.
+    # Read under the same name by gunicorn and uvicorn.
+    FORWARDED_ALLOW_IPS: str = "127.0.0.1"
+
+    @model_validator(mode="before")
+    @classmethod
+    def check_postgres_password(cls, data: Any) -> Any:
+        if isinstance(data, dict) and data.get("POSTGRES_SERVER"):
+            if (
+                data.get("POSTGRES_PASSWORD_FILE") is None
+                and data.get("POSTGRES_PASSWORD") is None
+            ):
+                raise ValueError(
+                    "At least one of POSTGRES_PASSWORD_FILE and POSTGRES_PASSWORD must be set."
+                )
+        return data
+
+    @field_validator("POSTGRES_PASSWORD_FILE")
+    def read_password_from_file(cls, v):
+        if v is not None:
+            file_path = v
+            if os.path.exists(file_path):
+                with open(file_path, "r") as file:
+                    return file.read().strip()
+            raise ValueError(f"Password file {file_path} does not exist.")
+        return v
+
+    @property
+    def SERVER_WORKERS(self) -> int:
+        if self.SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
+            # The writer queue of the SQLite profile is a lock of the process, writers of
+            # several processes would compete for the database lock again
+            return 1
+        return self.WEB_CONCURRENCY or os.cpu_count() or 1
+
+    @property
+    def DB_WORKER_POOL_SIZE(self) -> int:
+        if not self.DB_MAX_CONNECTIONS:
+            return self.DB_POOL_SIZE
+        return max(1, min(self.DB_POOL_SIZE, self.DB_MAX_CONNECTIONS // self.SERVER_WORKERS))
+
+    @property
+    def DB_WORKER_MAX_OVERFLOW(self) -> int:
+        if not self.DB_MAX_CONNECTIONS:
+            return self.DB_MAX_OVERFLOW
+        per_worker = self.DB_MAX_CONNECTIONS // self.SERVER_WORKERS
+        return max(0, min(self.DB_MAX_OVERFLOW, per_worker - self.DB_WORKER_POOL_SIZE))
+
     @computed_field
     @property
     def SQLALCHEMY_DATABASE_URL(self) -> str:
+        if self.POSTGRES_SERVER:
+            return str(
+                MultiHostUrl.build(
+                    scheme="postgresql+psycopg",
+                    username=self.POSTGRES_USER,
+                    password=(
+                        self.POSTGRES_PASSWORD
+                        if self.POSTGRES_PASSWORD
+                        else self.POSTGRES_PASSWORD_FILE
+                    ),
+                    host=self.POSTGRES_SERVER,
+                    port=self.POSTGRES_PORT,
+                    path=self.POSTGRES_DB,
+                )
+            )
+        # DB Connection for SQLite for local development
         return "sqlite:///./app.db"
 
+    @computed_field
+    @property
+    def REPLICA_SQLALCHEMY_DATABASE_URL(self) -> str | None:
+        if self.REPLICA_DATABASE_URL:
+            return self.REPLICA_DATABASE_URL
+        if self.POSTGRES_SERVER and self.POSTGRES_REPLICA_SERVER:
+            return str(
+                MultiHostUrl.build(
+                    scheme="postgresql+psycopg",
+                    username=self.POSTGRES_USER,
+                    password=(
+                        self.POSTGRES_PASSWORD
+                        if self.POSTGRES_PASSWORD
+                        else self.POSTGRES_PASSWORD_FILE
+                    ),
+                    host=self.POSTGRES_REPLICA_SERVER,
+                    port=self.POSTGRES_REPLICA_PORT,
+                    path=self.POSTGRES_DB,
+                )
+            )
+        return None
+
 
 settings = Settings()
@@ -0,0 +1,130 @@
+import math
+import threading
+from abc import ABC, abstractmethod
+import time
+from collections import OrderedDict
+from fastapi import HTTPException
+from starlette import status
+from app.core.config import settings
+
+
+class BucketStore(ABC):
+    """
+    Storage of the token buckets of the login limiter.
+
+    The default `InMemoryBucketStore` limits each worker on its own, so N workers allow N times
+    the configured rate. Deployments running several workers can plug in a shared store, e.g.
+    backed by Redis, by subclassing this class and assigning it to `login_limiter.store`
+    at startup.
+    """
+
+    @abstractmethod
+    def take(self, key: str, capacity: float, refill_per_second: float) -> float:
+        """
+        Take one token from the bucket of `key`, creating it full when it does not exist.
+
+        Returns:
+            float: 0 if a token was taken, otherwise the seconds until the next token is available.
+        """
+
+
+class InMemoryBucketStore(BucketStore):
+    """
+    Token buckets of this worker in a bounded dict. Buckets that have refilled are forgotten
+    first when the store is full, they behave like a new bucket anyway.
+    """
+
+    def __init__(self, max_entries: int = 100000):
+        self.max_entries = max_entries
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()  # key -> (tokens, updated_at)
+        self._lock = threading.Lock()
+
+    def take(self, key: str, capacity: float, refill_per_second: float) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * refill_per_second)
+            if tokens >= 1:
+                tokens -= 1
+                retry_after = 0.0
+            else:
+                retry_after = (1 - tokens) / refill_per_second
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_entries:
+                self._evict(now, capacity, refill_per_second)
+            return retry_after
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+    def _evict(self, now: float, capacity: float, refill_per_second: float) -> None:
+        # Caller holds the lock
+        for key in [
+            key
+            for key, (tokens, updated_at) in self._buckets.items()
+            if tokens + (now - updated_at) * refill_per_second >= capacity
+        ]:
+            del self._buckets[key]
+        while len(self._buckets) > self.max_entries:
+            self._buckets.popitem(last=False)
+
+
+class LoginLimiter:
+    """
+    Token-bucket throttling of login attempts, keyed by username and by client IP.
+
+    Every attempt takes a token from both buckets before the password is verified, a caller
+    whose bucket is empty gets a 429 with `Retry-After` without any bcrypt work. The username
+    bucket stops guessing against one account, the IP bucket stops a single client spraying
+    many accounts. A limit of 0 attempts per minute disables that bucket.
+    """
+
+    def __init__(
+        self,
+        store: BucketStore,
+        username_burst: int,
+        username_per_minute: int,
+        ip_burst: int,
+        ip_per_minute: int,
+    ):
+        self.store = store
+        self.username_burst = username_burst
+        self.username_per_minute = username_per_minute
+        self.ip_burst = ip_burst
+        self.ip_per_minute = ip_per_minute
+
+    def check(self, username: str, client_ip: str | None) -> None:
+        """
+        Take a login attempt for the username and client IP.
+
+        Raises:
+            HTTPException: If either bucket is empty (429).
+        """
+        retry_after = 0.0
+        if client_ip is not None and self.ip_per_minute > 0:
+            retry_after = self.store.take(
+                f"login:ip:{client_ip}", self.ip_burst, self.ip_per_minute / 60
+            )
+        # Usernames are matched case-insensitively so that case variants share a bucket
+        if not retry_after and self.username_per_minute > 0:
+            retry_after = self.store.take(
+                f"login:user:{username.lower()}",
+                self.username_burst,
+                self.username_per_minute / 60,
+            )
+        if retry_after:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many login attempts, please retry later.",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
+
+login_limiter = LoginLimiter(
+    store=InMemoryBucketStore(),
+    username_burst=settings.LOGIN_RATE_LIMIT_USERNAME_BURST,
+    username_per_minute=settings.LOGIN_RATE_LIMIT_USERNAME_PER_MINUTE,
+    ip_burst=settings.LOGIN_RATE_LIMIT_IP_BURST,
+    ip_per_minute=settings.LOGIN_RATE_LIMIT_IP_PER_MINUTE,
+)
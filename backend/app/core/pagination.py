@@ -0,0 +1,63 @@
+import base64
+from datetime import datetime
+from fastapi import HTTPException
+from sqlalchemy import DateTime, literal
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.types import TypeDecorator
+from starlette import status
+
+
+# Response header carrying the cursor of the next page, absent on the last page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """
+    Encode the keyset position `(created_at, id)` of the last row of a page into an opaque cursor.
+    """
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    Decode a cursor produced by `encode_cursor`.
+
+    Raises:
+        HTTPException: If the cursor is malformed (400).
+    """
+    try:
+        created_at, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(row_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor.",
+        )
+
+
+class ServerTimestamp(TypeDecorator):
+    """
+    DateTime bound in the format of `server_default=func.now()` values. SQLite stores those
+    as 'YYYY-MM-DD HH:MM:SS' text and compares them as strings, so a bound value must not
+    carry the microseconds SQLAlchemy adds by default.
+    """
+
+    impl = DateTime
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "sqlite":
+            return dialect.type_descriptor(
+                sqlite.DATETIME(
+                    storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"
+                )
+            )
+        return dialect.type_descriptor(DateTime())
+
+
+def server_timestamp(value: datetime):
+    """
+    Bind a datetime to compare against a `server_default=func.now()` column.
+    """
+    return literal(value, ServerTimestamp())
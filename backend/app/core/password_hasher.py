@@ -0,0 +1,174 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Optional
+from fastapi import HTTPException
+from starlette import status
+from app.core.config import settings
+
+
+# Module-level so that they can be pickled to the workers of a process pool, each process
+# builds the CryptContext once through the cached `settings.bcrypt_context`
+def _hash(password: str) -> str:
+    return settings.bcrypt_context.hash(password)
+
+
+def _verify(password: str, hashed_password: str) -> bool:
+    return settings.bcrypt_context.verify(password, hashed_password)
+
+
+def _verify_and_update(
+    password: str, hashed_password: str
+) -> tuple[bool, Optional[str]]:
+    return settings.bcrypt_context.verify_and_update(password, hashed_password)
+
+
+class PasswordHasher:
+    """
+    Bounded executor for bcrypt hashing and verification.
+
+    bcrypt is deliberately slow, running it in the request threads lets a login burst occupy
+    the whole AnyIO thread pool and stall unrelated traffic. Password work is submitted to a
+    dedicated pool of `max_workers` threads (bcrypt releases the GIL) or processes instead.
+    At most `max_pending` jobs wait behind the running ones, further submissions are rejected
+    at once with a 503 so that callers back off instead of piling up.
+    """
+
+    def __init__(self, executor_type: str, max_workers: int, max_pending: int):
+        self.executor_type = executor_type
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor: Executor | None = None
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+        self._lock = threading.Lock()
+
+        # Metrics
+        self._in_flight = 0
+        self._submitted = 0
+        self._completed = 0
+        self._rejected = 0
+        self._total_seconds = 0.0
+        self._max_seconds = 0.0
+
+    def hash(self, password: str) -> str:
+        return self._submit(_hash, password).result()
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        return self._submit(_verify, password, hashed_password).result()
+
+    def verify_and_update(
+        self, password: str, hashed_password: str
+    ) -> tuple[bool, Optional[str]]:
+        """
+        Verify the password and rehash it when the stored hash uses a deprecated scheme or
+        another cost factor than configured.
+
+        Returns:
+            tuple[bool, Optional[str]]: Whether the password matches and the new hash, None if
+            the stored hash is current or the password does not match.
+        """
+        return self._submit(_verify_and_update, password, hashed_password).result()
+
+    def hash_many(self, passwords: list[str]) -> list[str]:
+        """
+        Hash a batch of passwords, at most `max_workers` at a time so that a bulk import
+        does not use up the queue of interactive logins.
+        """
+        hashed_passwords = []
+        for start in range(0, len(passwords), self.max_workers):
+            futures = [
+                self._submit(_hash, password)
+                for password in passwords[start : start + self.max_workers]
+            ]
+            hashed_passwords.extend(future.result() for future in futures)
+        return hashed_passwords
+
+    async def verify_async(self, password: str, hashed_password: str) -> bool:
+        return await asyncio.wrap_future(
+            self._submit(_verify, password, hashed_password)
+        )
+
+    async def verify_and_update_async(
+        self, password: str, hashed_password: str
+    ) -> tuple[bool, Optional[str]]:
+        return await asyncio.wrap_future(
+            self._submit(_verify_and_update, password, hashed_password)
+        )
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "executor": self.executor_type,
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "in_flight": self._in_flight,
+                "queue_depth": max(0, self._in_flight - self.max_workers),
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "avg_latency_ms": (
+                    self._total_seconds / self._completed * 1000
+                    if self._completed
+                    else 0.0
+                ),
+                "max_latency_ms": self._max_seconds * 1000,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _get_executor(self) -> Executor:
+        # Created on first use so that forked server workers each start their own pool
+        with self._lock:
+            if self._executor is None:
+                if self.executor_type == "process":
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="password-hasher",
+                    )
+            return self._executor
+
+    def _submit(self, fn: Callable, *args) -> Future:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many password operations in progress, please retry shortly.",
+                headers={"Retry-After": "1"},
+            )
+
+        started = time.perf_counter()
+        with self._lock:
+            self._in_flight += 1
+            self._submitted += 1
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._finish(started, completed=False)
+            raise
+        future.add_done_callback(lambda _: self._finish(started))
+        return future
+
+    def _finish(self, started: float, completed: bool = True) -> None:
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._in_flight -= 1
+            if completed:
+                self._completed += 1
+                self._total_seconds += elapsed
+                self._max_seconds = max(self._max_seconds, elapsed)
+        self._slots.release()
+
+
+password_hasher = PasswordHasher(
+    executor_type=settings.PASSWORD_HASHER_EXECUTOR,
+    max_workers=settings.PASSWORD_HASHER_MAX_WORKERS,
+    max_pending=settings.PASSWORD_HASHER_MAX_PENDING,
+)
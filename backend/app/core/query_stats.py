@@ -0,0 +1,167 @@
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Longest statement text quoted in a log line
+STATEMENT_LOG_LENGTH = 300
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class QueryStats:
+    """
+    SQL statements executed on behalf of one request, and the time spent in the database.
+    """
+
+    def __init__(self, method: str = "", path: str = ""):
+        self.method = method
+        self.path = path
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: Counter[str] = Counter()
+        self._lock = threading.Lock()  # A request may run queries from several threads
+
+    def record(self, statement: str, seconds: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.seconds += seconds
+            self.statements[statement] += 1
+
+    def repeated_statements(self, threshold: int) -> list[tuple[str, int]]:
+        """
+        Return the statements executed at least `threshold` times, most repeated first. The
+        same parameterized statement run once per row of a list, e.g. by a lazy load during
+        serialization, is the signature of an N+1 query pattern.
+        """
+        return [
+            (statement, count)
+            for statement, count in self.statements.most_common()
+            if count >= threshold
+        ]
+
+    def server_timing(self) -> str:
+        queries = "query" if self.count == 1 else "queries"
+        return f'db;dur={self.seconds * 1000:.1f};desc="{self.count} {queries}"'
+
+
+# Stats of the request being served, copied into the thread pool of sync routes and
+# dependencies along with the rest of the context
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+# Lists of finished requests collected by active `query_budget` blocks
+_observers: list[list[QueryStats]] = []
+_observers_lock = threading.Lock()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current_stats.get() is not None:
+        context._query_stats_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    started = getattr(context, "_query_stats_started", None)
+    if stats is not None and started is not None:
+        stats.record(statement, time.perf_counter() - started)
+
+
+class QueryStatsMiddleware:
+    """
+    Count the SQL statements and the database time of every HTTP request.
+
+    The totals are sent in a `Server-Timing` header, shown by the network panel of browsers.
+    Statements run while a streaming response is being sent are not in the header, they only
+    count towards the N+1 check, which logs a warning once the response is complete for every
+    statement repeated at least `n_plus_one_threshold` times.
+    """
+
+    def __init__(self, app: ASGIApp, n_plus_one_threshold: int = 10):
+        self.app = app
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(scope["method"], scope["path"])
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("Server-Timing", stats.server_timing())
+            await send(message)
+
+        token = _current_stats.set(stats)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+            self._report(stats)
+
+    def _report(self, stats: QueryStats) -> None:
+        if self.n_plus_one_threshold:
+            for statement, count in stats.repeated_statements(self.n_plus_one_threshold):
+                logger.warning(
+                    f"N+1 suspect: {stats.method} {stats.path} ran the same statement {count} "
+                    f"times ({stats.count} statements in total): "
+                    f"{' '.join(statement.split())[:STATEMENT_LOG_LENGTH]}"
+                )
+        if _observers:
+            with _observers_lock:
+                for observer in _observers:
+                    observer.append(stats)
+
+
+@contextmanager
+def query_budget(max_queries: int) -> Iterator[list[QueryStats]]:
+    """
+    Assert that every request served inside the block executes at most `max_queries` SQL
+    statements, e.g. in a test:
+
+        with query_budget(3):
+            client.get("/items/")
+
+    Requires `QueryStatsMiddleware` on the application, which is the default.
+
+    Args:
+
+        max_queries: Statement budget of each request.
+
+    Returns:
+
+        The stats of the requests finished inside the block, filled in as they complete.
+
+    Raises:
+
+        AssertionError: If a request exceeded the budget, listing its most repeated statements.
+    """
+    requests: list[QueryStats] = []
+    with _observers_lock:
+        _observers.append(requests)
+    try:
+        yield requests
+    finally:
+        with _observers_lock:
+            _observers.remove(requests)
+
+    over_budget = [stats for stats in requests if stats.count > max_queries]
+    if over_budget:
+        lines = []
+        for stats in over_budget:
+            lines.append(
+                f"{stats.method} {stats.path} ran {stats.count} statements, budget {max_queries}"
+            )
+            for statement, count in stats.statements.most_common(3):
+                lines.append(f"  {count}x {' '.join(statement.split())[:STATEMENT_LOG_LENGTH]}")
+        raise AssertionError("\n".join(lines))
+
@@ -1,46 +1,125 @@
+import logging
+import uuid
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from datetime import timedelta, datetime, timezone
 from typing import Annotated
 from fastapi import Depends, HTTPException
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, selectinload
 from starlette import status
 from app.core.config import settings
 from app.db.models.rbac import User
 from app.db.base import get_db
+from app.services.permission_cache import permission_cache
+from app.services.permission_registry import RegistrySnapshot, permission_registry
+from app.services.revocation_list import revocation_list
+from app.services.token_cache import token_cache
 from app.services.user_service import UserService
 
 
 db_dependency = Annotated[Session, Depends(get_db)]
 
 
-def authenticate_user(username: str, password: str, db: db_dependency):
-    # Fetch the user from DB
-    stmt = select(User).where(User.user_name == username)
-    user_model = db.execute(stmt).scalars().first()
+def _get_user_by_name(db: Session, username: str) -> Optional[User]:
+    # Roles are loaded with the user, the login response and token claims need them
+    stmt = (
+        select(User).where(User.user_name == username).options(selectinload(User.roles))
+    )
+    return db.execute(stmt).scalars().first()
+
+
+async def authenticate_user(username: str, password: str, db: db_dependency):
+    # Fetch the user from DB, the session is synchronous so keep the query off the event loop
+    user_model = await run_in_threadpool(_get_user_by_name, db, username)
     # Check if user exists and is enabled
     if user_model is None:
         return False
     if not user_model.enabled:
         return False
 
-    # Verify credentials against DB
+    # Verify credentials against DB, bcrypt runs on the password hasher pool
     # if not settings.bcrypt_context.verify(password, user_model.hashed_password):  # type: ignore
-    if not UserService().check_password(user_model, password):
+    valid, new_hash = await UserService.check_and_upgrade_password_async(
+        user_model, password
+    )
+    if not valid:
         return False
 
+    # The stored hash has an outdated scheme or cost, replace it now that the password is known
+    if new_hash is not None:
+        await run_in_threadpool(_save_password_hash, db, user_model, new_hash)
+
     return user_model
 
 
+def _save_password_hash(db: Session, user_model: User, hashed_password: str) -> None:
+    # Committing expires the loaded user, it is refreshed here with its roles rather than lazily
+    # loaded on the event loop. A failure only postpones the upgrade to the next login.
+    user_id = user_model.user_id
+    try:
+        db.execute(
+            update(User).where(User.user_id == user_id).values(hashed_password=hashed_password)
+        )
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        logging.error(f"Failed to upgrade the password hash of user {user_id}: {str(e)}")
+    db.refresh(user_model)
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    The authenticated caller as described by a stateless principal token, authorizing it
+    needs no database access.
+    """
+
+    user_id: int
+    user_name: str
+    role_ids: frozenset[int]
+    permission_mask: int
+    registry: RegistrySnapshot
+
+    def has_permission(self, permission_name: str) -> bool:
+        return self.registry.has_permission(self.permission_mask, permission_name)
+
+
+def create_principal_claims(db: Session, user: User) -> dict:
+    """
+    Build the claims of a stateless principal token: the user's role IDs, the permission
+    bitmask they grant as a hex string and the version of the registry that maps the bits.
+    """
+    registry = permission_registry.get(db)
+    role_ids = sorted(role.role_id for role in user.roles)
+    return {
+        "roles": role_ids,
+        "perms": format(registry.mask_of(role_ids), "x"),
+        "pv": registry.version,
+    }
+
+
 def create_access_token(
     username: str,
     user_id: int,
     expires_delta: Optional[timedelta] = None,
     remember_me: bool = False,
+    claims: Optional[dict] = None,
 ):
-    encode = {"sub": username, "id": user_id}
+    # `jti` identifies the token in the revocation list, `iat` dates it against user-wide revocations.
+    # `iat` keeps its fraction of a second, a token issued right after a revocation must outlive it.
+    encode = {
+        "sub": username,
+        "id": user_id,
+        "jti": uuid.uuid4().hex,
+        "iat": datetime.now(timezone.utc).timestamp(),
+    }
+    if claims:
+        encode.update(claims)
     if expires_delta:
         expire = datetime.now(timezone.utc) + expires_delta
     elif remember_me:
@@ -60,6 +139,17 @@ def create_access_token(
 def get_current_user(
     token: Annotated[str, Depends(settings.oauth2_bearer)], db: db_dependency
 ):
+    # A token seen before resolves without decoding it or querying the user
+    cached = token_cache.get(db, token)
+    if cached is not None:
+        user_model, payload = cached
+        if revocation_list.is_revoked(db, payload):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate user.",
+            )
+        return user_model
+
     try:
         # Retrieve details from jwt token payload
         payload = jwt.decode(
@@ -77,12 +167,17 @@ def get_current_user(
         stmt = select(User).where(User.user_name == username)
         user_model = db.execute(stmt).scalars().first()
 
-        if user_model is None:
+        if (
+            user_model is None
+            or not user_model.enabled
+            or revocation_list.is_revoked(db, payload)
+        ):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Could not validate user.",
             )
 
+        token_cache.put(token, user_model, payload)
         return user_model
 
     except Exception:
@@ -91,10 +186,63 @@ def get_current_user(
         )
 
 
+def get_current_principal(
+    token: Annotated[str, Depends(settings.oauth2_bearer)], db: db_dependency
+) -> Principal:
+    """
+    Resolve the caller from the claims of a stateless principal token. The database is only
+    used to reload the process-local permission registry when it expires.
+
+    Raises:
+        HTTPException: If the token is invalid, lacks the principal claims or was minted against
+                       another permission registry version (401).
+    """
+    try:
+        payload = jwt.decode(
+            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+        )
+        username: str = payload.get("sub")
+        user_id: int = payload.get("id")
+        version: str = payload.get("pv")
+        if username is None or user_id is None or version is None:
+            raise JWTError("Missing principal claims")
+        role_ids = frozenset(payload.get("roles", []))
+        permission_mask = int(payload.get("perms", "0"), 16)
+
+    except (JWTError, ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate user."
+        )
+
+    if revocation_list.is_revoked(db, payload):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate user."
+        )
+
+    registry = permission_registry.get(db, version)
+    if registry.version != version:
+        # Roles or permissions changed since the token was issued, its bits can no longer be trusted
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token permissions are outdated, please log in again.",
+        )
+
+    return Principal(
+        user_id=user_id,
+        user_name=username,
+        role_ids=role_ids,
+        permission_mask=permission_mask,
+        registry=registry,
+    )
+
+
 def check_permissions(required_permission: str):
     """
     Check if the current user has the required permission.
 
+    With `STATELESS_PRINCIPAL_TOKENS` the permission is read from the token bitmask without
+    any database access, otherwise from the permission cache of the user loaded from the token.
+
     Args:
         required_permission (str): The permission required to perform an action.
 
@@ -102,15 +250,25 @@ def check_permissions(required_permission: str):
         function: A permission checker function that raises an HTTPException if the user lacks the required permission.
     """
 
-    def permission_checker(user: User = Depends(get_current_user)):
-        if not any(
-            permission.name == required_permission
-            for role in user.roles
-            for permission in role.permissions
+    def raise_forbidden():
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Operation not permitted because of insufficient permissions",
+        )
+
+    if settings.STATELESS_PRINCIPAL_TOKENS:
+
+        def principal_checker(principal: Principal = Depends(get_current_principal)):
+            if not principal.has_permission(required_permission):
+                raise_forbidden()
+
+        return principal_checker
+
+    def permission_checker(db: db_dependency, user: User = Depends(get_current_user)):
+        # Resolved from the permission cache, a miss costs one join query instead of lazy loading every role
+        if required_permission not in permission_cache.get_permissions(
+            db, user.user_id
         ):
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Operation not permitted because of insufficient permissions",
-            )
+            raise_forbidden()
 
     return permission_checker
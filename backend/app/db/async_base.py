@@ -0,0 +1,57 @@
+# Async counterpart of app/db/base.py, used by the async routes of the hot endpoints when
+# `DB_ASYNC_ROUTES` is set. Same database and pool settings, driven by aiosqlite for SQLite
+# and by the async mode of psycopg for PostgreSQL.
+from sqlalchemy import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from app.core.config import settings
+from app.db.base import SQLALCHEMY_DATABASE_URL, engine_options
+from app.db.sqlite_profile import apply_sqlite_profile
+
+
+def async_database_url(url: str) -> str:
+    """
+    Map the database URL to its async driver. `postgresql+psycopg` serves both modes and is
+    kept as is, SQLAlchemy picks the async dialect of psycopg for an async engine.
+    """
+    database_url = make_url(url)
+    if database_url.get_backend_name() == "sqlite":
+        database_url = database_url.set(drivername="sqlite+aiosqlite")
+    return database_url.render_as_string(hide_password=False)
+
+
+ASYNC_DATABASE_URL = async_database_url(SQLALCHEMY_DATABASE_URL)
+
+
+def async_engine_options(url: str) -> dict:
+    options = engine_options(url)
+    if make_url(url).get_backend_name() == "sqlite":
+        # aiosqlite defaults to NullPool, pool its connections like the sync engine does
+        options["poolclass"] = AsyncAdaptedQueuePool
+    return options
+
+
+# Only created when enabled, so that the async drivers stay optional
+async_engine = (
+    create_async_engine(ASYNC_DATABASE_URL, **async_engine_options(ASYNC_DATABASE_URL))
+    if settings.DB_ASYNC_ROUTES
+    else None
+)
+if (
+    async_engine is not None
+    and async_engine.dialect.name == "sqlite"
+    and settings.SQLITE_PERFORMANCE_PROFILE
+):
+    # The writer queue of the profile would block the event loop, async writers wait on
+    # busy_timeout in the driver thread instead
+    apply_sqlite_profile(async_engine.sync_engine, serialize_writes=False)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False
+)
+
+
+# Dependency of the async routes, the sync services run on it through `AsyncSession.run_sync`
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,24 +1,121 @@
 # Inside app/db/base.py
-from sqlalchemy import create_engine
+import logging
+from fastapi import Request
+from sqlalchemy import create_engine, make_url
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from app.core.config import settings
+from app.db.replica import ReplicaRouter
+from app.db.sqlite_profile import apply_sqlite_profile
 
 # SQLALCHEMY_DATABASE_URL = 'sqlite:///./app.db'
 SQLALCHEMY_DATABASE_URL = str(
     settings.SQLALCHEMY_DATABASE_URL
 )  # "postgresql+psycopg://dbadmin:test123@db:5432/stox"
-engine = create_engine(SQLALCHEMY_DATABASE_URL)  # str(settings.SQLALCHEMY_DATABASE_URI)
+
+
+def engine_options(url: str) -> dict:
+    """
+    Keyword arguments of `create_engine` for the pool settings, see the database section of
+    app/core/config.py for sizing the pool per worker.
+    """
+    options = {
+        "pool_size": settings.DB_WORKER_POOL_SIZE,
+        "max_overflow": settings.DB_WORKER_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+    }
+    if (
+        make_url(url).get_backend_name() == "postgresql"
+        and settings.DB_STATEMENT_TIMEOUT_MS
+    ):
+        # Set per connection so that a runaway query cannot hold a pooled connection forever
+        options["connect_args"] = {
+            "options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+        }
+    return options
+
+
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL)
+)
+if engine.dialect.name == "sqlite" and settings.SQLITE_PERFORMANCE_PROFILE:
+    apply_sqlite_profile(engine)
+
+# Optional read replica, GET requests are routed to it by `get_db`
+REPLICA_DATABASE_URL = settings.REPLICA_SQLALCHEMY_DATABASE_URL
+replica_engine = (
+    create_engine(REPLICA_DATABASE_URL, **engine_options(REPLICA_DATABASE_URL))
+    if REPLICA_DATABASE_URL
+    else None
+)
+if (
+    replica_engine is not None
+    and replica_engine.dialect.name == "sqlite"
+    and settings.SQLITE_PERFORMANCE_PROFILE
+):
+    apply_sqlite_profile(replica_engine, serialize_writes=False)
+
+replica_router = ReplicaRouter(
+    replica_engine,
+    sticky_seconds=settings.REPLICA_STICKY_SECONDS,
+    max_lag_seconds=settings.REPLICA_MAX_LAG_SECONDS,
+    lag_check_interval_seconds=settings.REPLICA_LAG_CHECK_INTERVAL_SECONDS,
+)
+
+
+def log_engine_configuration() -> None:
+    """
+    Log the database and the effective pool of this worker, once at startup.
+    """
+    pool = engine.pool
+    statement_timeout = (
+        f"{settings.DB_STATEMENT_TIMEOUT_MS}ms"
+        if "connect_args" in engine_options(SQLALCHEMY_DATABASE_URL)
+        else "off"
+    )
+    # uvicorn configures this logger at INFO, the root logger only shows warnings
+    logging.getLogger("uvicorn.error").info(
+        f"Database {engine.url.render_as_string(hide_password=True)} with {type(pool).__name__}: "
+        f"pool_size={settings.DB_WORKER_POOL_SIZE} max_overflow={settings.DB_WORKER_MAX_OVERFLOW} "
+        f"(at most {settings.DB_WORKER_POOL_SIZE + settings.DB_WORKER_MAX_OVERFLOW} connections "
+        f"per worker), "
+        f"pool_timeout={settings.DB_POOL_TIMEOUT_SECONDS}s pre_ping={settings.DB_POOL_PRE_PING} "
+        f"recycle={settings.DB_POOL_RECYCLE_SECONDS}s statement_timeout={statement_timeout}"
+        + (
+            f" sqlite_profile={settings.SQLITE_PERFORMANCE_PROFILE}"
+            if engine.dialect.name == "sqlite"
+            else ""
+        )
+        + (
+            f", read replica {replica_engine.url.render_as_string(hide_password=True)}"
+            if replica_engine is not None
+            else ""
+        )
+    )
+
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
 
 # Base class to create models
 Base = declarative_base()
 
 
+def session_factory_for(request: Request) -> sessionmaker:
+    """
+    Return the session factory of the database that serves the request, the read replica for
+    read-only requests when it is configured and in sync, the primary otherwise.
+    """
+    if replica_router.use_replica(request):
+        return ReplicaSessionLocal
+    return SessionLocal
+
+
 # Dependency that will be used in the FastAPI routes to get a session
-def get_db():
-    db = SessionLocal()
+def get_db(request: Request):
+    db = session_factory_for(request)()
     try:
         yield db
     finally:
@@ -0,0 +1,55 @@
+# Registry of eager-loading options per read schema.
+#
+# Pydantic walks every relationship of a read schema while serializing a response, a lazy
+# relationship then costs one query per row. Endpoints returning a read schema pass
+# `loader_options(Schema)` to their select so that the number of queries stays fixed
+# whatever the number of rows. Keep each chain in sync with the nested fields of its schema.
+
+from sqlalchemy.orm import joinedload, selectinload
+from app.db.models.checkout_item import CheckoutItem
+from app.db.models.checkout_transaction import CheckoutTransaction
+from app.db.models.employee import Employee
+from app.db.models.item import Item
+from app.db.models.scanned_invoice import ScannedInvoice
+from app.db.models.scanned_invoice_item import ScannedInvoiceItem
+from app.schemas.checkout_transaction import CheckoutTransactionReadRequest
+from app.schemas.item import ItemReadRequest
+from app.schemas.scanned_invoice import ScannedInvoiceReadRequest
+
+
+# ItemReadRequest: item_category, vendor, department and uom are many-to-one, join them in the same query
+_ITEM_READ_OPTIONS = (
+    joinedload(Item.item_category),
+    joinedload(Item.vendor),
+    joinedload(Item.department),
+    joinedload(Item.uom),
+)
+
+READ_LOADER_OPTIONS = {
+    ItemReadRequest: _ITEM_READ_OPTIONS,
+    # CheckoutTransactionReadRequest: employee.department, department, checkout_items[].category and uom
+    CheckoutTransactionReadRequest: (
+        joinedload(CheckoutTransaction.employee).joinedload(Employee.department),
+        joinedload(CheckoutTransaction.department),
+        selectinload(CheckoutTransaction.checkout_items).options(
+            joinedload(CheckoutItem.category),
+            joinedload(CheckoutItem.uom),
+        ),
+    ),
+    # ScannedInvoiceReadRequest: vendor, employee.department, scanned_invoice_items[].item (as ItemReadRequest)
+    ScannedInvoiceReadRequest: (
+        joinedload(ScannedInvoice.vendor),
+        joinedload(ScannedInvoice.employee).joinedload(Employee.department),
+        selectinload(ScannedInvoice.scanned_invoice_items)
+        .selectinload(ScannedInvoiceItem.item)
+        .options(*_ITEM_READ_OPTIONS),
+    ),
+}
+
+
+def loader_options(schema: type) -> tuple:
+    """
+    Return the eager-loading options serializing `schema` needs, e.g.
+    `select(CheckoutTransaction).options(*loader_options(CheckoutTransactionReadRequest))`.
+    """
+    return READ_LOADER_OPTIONS[schema]
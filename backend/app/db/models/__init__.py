@@ -11,3 +11,6 @@ from app.db.models.scanned_invoice_item import ScannedInvoiceItem
 from app.db.models.checkout_transaction import CheckoutTransaction
 from app.db.models.checkout_item import CheckoutItem
 from app.db.models.inventory_adjustment_log import InventoryAdjustmentLog
+from app.db.models.idempotency_key import IdempotencyKey
+from app.db.models.refresh_token import RefreshToken
+from app.db.models.revoked_token import RevokedToken
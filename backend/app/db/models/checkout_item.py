@@ -1,6 +1,7 @@
 from sqlalchemy import (
     Column,
     DateTime,
+    Index,
     Integer,
     UniqueConstraint,
     func,
@@ -49,6 +50,8 @@ class CheckoutItem(Base):
     # Unique constraint to ensure that the line number is unique within the scope of each transaction
     __table_args__ = (
         UniqueConstraint("transaction_id", "line_number", name="uq_transaction_line"),
+        # Supports filtering transactions by item
+        Index("ix_checkout_items_item_id_transaction_id", "item_id", "transaction_id"),
     )
 
     def __repr__(self):
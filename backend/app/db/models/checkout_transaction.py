@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, Integer, func, ForeignKey
+from sqlalchemy import Column, DateTime, Index, Integer, func, ForeignKey
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
@@ -26,5 +26,23 @@ class CheckoutTransaction(Base):
     department = relationship("Department", back_populates="checkout_transactions")
     checkout_items = relationship("CheckoutItem", back_populates="transaction")
 
+    # Composite indexes matching the keyset pagination order (created_at, transaction_id) of the list endpoint,
+    # with and without the employee and department filters, so that any page costs the same as the first one
+    __table_args__ = (
+        Index("ix_checkout_transactions_created_at_id", "created_at", "transaction_id"),
+        Index(
+            "ix_checkout_transactions_employee_created_at_id",
+            "employee_id",
+            "created_at",
+            "transaction_id",
+        ),
+        Index(
+            "ix_checkout_transactions_department_created_at_id",
+            "department_id",
+            "created_at",
+            "transaction_id",
+        ),
+    )
+
     def __repr__(self):
         return f"<Checkout Transaction(id={self.transaction_id}, Employee='{self.employee_id}', Department='{self.department_id}')>"
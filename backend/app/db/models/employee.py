@@ -14,7 +14,7 @@ class Employee(Base):
     middle_name = Column(String(50))
     last_name = Column(String(50), nullable=False)
     department_id = Column(
-        Integer, ForeignKey("departments.department_id"), nullable=False
+        Integer, ForeignKey("departments.department_id"), nullable=False, index=True
     )
 
     # Created at timestamp
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, DateTime, Integer, String, Text, func
+from app.db.base import Base
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    # The key is scoped by endpoint so that the same client key can be used for a checkout and an invoice
+    endpoint = Column(String(100), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    request_hash = Column(
+        String(64), nullable=False
+    )  # SHA-256 of the request body, a replayed key must carry the same request
+    status_code = Column(Integer, nullable=False)
+    response_body = Column(Text, nullable=False)  # JSON encoded response returned on replay
+    expires_at = Column(DateTime, nullable=False, index=True)  # Used by the TTL purge
+
+    # Created at timestamp
+    created_at = Column(DateTime, server_default=func.now())
+
+    def __repr__(self):
+        return f"<IdempotencyKey(endpoint='{self.endpoint}', key='{self.key}', status_code={self.status_code})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, func
+from sqlalchemy import Column, Index, Integer, String, ForeignKey, DateTime, func
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
@@ -28,3 +28,11 @@ class InventoryAdjustmentLog(Base):
     scanned_invoice_item = relationship(
         "ScannedInvoiceItem", back_populates="inventory_adjustment_log"
     )
+
+    __table_args__ = (
+        # Supports the adjustment history of an item and reading the logs by time range
+        Index(
+            "ix_inventory_adjustment_logs_item_id_adjusted_at", "item_id", "adjusted_at"
+        ),
+        Index("ix_inventory_adjustment_logs_adjusted_at", "adjusted_at"),
+    )
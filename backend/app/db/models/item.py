@@ -1,4 +1,13 @@
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, func
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    func,
+)
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
@@ -20,7 +29,7 @@ class Item(Base):
     )
 
     has_barcode = Column(Boolean, default=False)
-    barcode = Column(String(13))
+    barcode = Column(String(13), index=True)
 
     image_path = Column(String(255))
 
@@ -55,3 +64,13 @@ class Item(Base):
         "InventoryAdjustmentLog", back_populates="item"
     )
     scanned_invoice_items = relationship("ScannedInvoiceItem", back_populates="item")
+
+    __table_args__ = (
+        # Partial index of the low-stock items, only the few rows below their threshold are indexed
+        Index(
+            "ix_items_low_stock",
+            "item_id",
+            postgresql_where=quantity < low_stock_threshold,
+            sqlite_where=quantity < low_stock_threshold,
+        ),
+    )
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, func
+from sqlalchemy.orm import relationship
+from app.db.base import Base
+
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    token_id = Column(Integer, primary_key=True, autoincrement=True)
+    token_hash = Column(
+        String(64), unique=True, nullable=False
+    )  # SHA-256 of the token, the token itself is never stored
+    user_id = Column(Integer, ForeignKey("users.user_id"), nullable=False, index=True)
+    family_id = Column(
+        String(32), nullable=False, index=True
+    )  # Shared by all the tokens rotated from the same login, revoked together on reuse
+    expires_at = Column(DateTime, nullable=False, index=True)  # Used by the expiry purge
+    revoked_at = Column(DateTime)  # Set when the token is rotated or revoked
+
+    # Created at timestamp
+    created_at = Column(DateTime, server_default=func.now())
+
+    # Relationships
+    user = relationship("User")
+
+    def __repr__(self):
+        return f"<RefreshToken(id={self.token_id}, user_id={self.user_id}, family='{self.family_id}')>"
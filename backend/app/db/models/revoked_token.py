@@ -0,0 +1,21 @@
+from sqlalchemy import Column, DateTime, Integer, String
+from app.db.base import Base
+
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    revocation_id = Column(Integer, primary_key=True, autoincrement=True)
+    jti = Column(String(32), index=True)  # Revokes a single access token
+    user_id = Column(
+        Integer, index=True
+    )  # Revokes every access token of the user issued before `revoked_at`, not a foreign key so it outlives the user
+    revoked_at = Column(
+        DateTime, nullable=False, index=True
+    )  # Workers load the revocations incrementally by this timestamp
+    expires_at = Column(
+        DateTime, nullable=False, index=True
+    )  # The revoked tokens are expired after this time, the entry can be purged
+
+    def __repr__(self):
+        return f"<RevokedToken(id={self.revocation_id}, jti='{self.jti}', user_id={self.user_id})>"
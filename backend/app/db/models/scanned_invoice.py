@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, Integer, String, func, ForeignKey
+from sqlalchemy import Column, DateTime, Index, Integer, String, func, ForeignKey
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
@@ -30,5 +30,16 @@ class ScannedInvoice(Base):
         "ScannedInvoiceItem", back_populates="scanned_invoice"
     )
 
+    # An invoice number is unique per vendor, a unique index rather than a constraint so that
+    # PostgreSQL can build it concurrently
+    __table_args__ = (
+        Index(
+            "uq_scanned_invoices_vendor_invoice_number",
+            "vendor_id",
+            "invoice_number",
+            unique=True,
+        ),
+    )
+
     def __repr__(self):
         return f"<Scanned Invoice (id={self.scan_id}, scanned by='{self.scanned_by}', invoice number='{self.invoice_number}')>"
@@ -0,0 +1,140 @@
+import logging
+import math
+import threading
+import time
+from typing import Optional
+from fastapi import Request
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Methods served by a replica, every other request may write and goes to the primary
+READ_METHODS = frozenset({"GET", "HEAD"})
+
+# Time of the client's last write in seconds since the epoch, handed to the client by
+# `LastWriteMiddleware` so that whichever worker serves its next read knows about the write.
+# Browsers return the cookie by themselves, other clients can echo the header.
+LAST_WRITE_COOKIE = "last_write"
+LAST_WRITE_HEADER = "X-Last-Write"
+
+# PostgreSQL standby: seconds since the last replayed transaction, 0 when every received WAL
+# record is replayed, i.e. caught up even if the primary has been idle for a while
+POSTGRESQL_LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+
+class ReplicaRouter:
+    """
+    Decides per request whether the database session reads from the replica or the primary.
+
+    Read-only requests (GET, HEAD) go to the replica, except:
+    - for `sticky_seconds` after a write request of the same client, so that a client reads
+      its own writes. The time of the write comes with the request, in the `X-Last-Write`
+      header or the `last_write` cookie set by `LastWriteMiddleware`, so every worker and
+      server process sees it.
+    - while the replica lags more than `max_lag_seconds` behind the primary or cannot be
+      reached. The lag is measured at most once per `lag_check_interval_seconds`, on PostgreSQL
+      from the WAL replay position. Other databases, e.g. a second SQLite file standing in for
+      a replica locally, only get a connectivity check.
+    """
+
+    def __init__(
+        self,
+        engine: Optional[Engine],
+        sticky_seconds: float,
+        max_lag_seconds: float,
+        lag_check_interval_seconds: float,
+    ):
+        self.engine = engine
+        self.sticky_seconds = sticky_seconds
+        self.max_lag_seconds = max_lag_seconds
+        self.lag_check_interval_seconds = lag_check_interval_seconds
+        self._lag = 0.0
+        self._lag_checked_at = -math.inf
+        self._lag_lock = threading.Lock()
+
+    def use_replica(self, request: Request) -> bool:
+        if self.engine is None or request.method not in READ_METHODS:
+            return False
+        last_write = self.last_write(request)
+        if last_write is not None and time.time() - last_write < self.sticky_seconds:
+            return False
+        return self.replica_lag() <= self.max_lag_seconds
+
+    def replica_lag(self) -> float:
+        """
+        Return the last measured replication lag in seconds, infinite if the replica could
+        not be queried. Measures it again once the check interval has elapsed.
+        """
+        if time.monotonic() - self._lag_checked_at < self.lag_check_interval_seconds:
+            return self._lag
+        # One request measures while the others use the previous value
+        if not self._lag_lock.acquire(blocking=False):
+            return self._lag
+        try:
+            with self.engine.connect() as connection:
+                if self.engine.dialect.name == "postgresql":
+                    self._lag = float(connection.execute(POSTGRESQL_LAG_QUERY).scalar())
+                else:
+                    connection.execute(text("SELECT 1"))
+                    self._lag = 0.0
+        except SQLAlchemyError as e:
+            logging.error(f"Replica check failed, reading from the primary: {str(e)}")
+            self._lag = math.inf
+        finally:
+            self._lag_checked_at = time.monotonic()
+            self._lag_lock.release()
+        return self._lag
+
+    @staticmethod
+    def last_write(request: Request) -> Optional[float]:
+        """
+        Return the time of the client's last write sent with the request, None if absent or
+        malformed. A forged value can only send the client's own reads to the primary.
+        """
+        value = request.headers.get(LAST_WRITE_HEADER) or request.cookies.get(LAST_WRITE_COOKIE)
+        try:
+            return float(value) if value else None
+        except ValueError:
+            return None
+
+
+class LastWriteMiddleware:
+    """
+    Stamp the response of every write request (not GET or HEAD) with the current time, in the
+    `last_write` cookie and the `X-Last-Write` header, for `ReplicaRouter` to keep the client's
+    following reads on the primary. The cookie expires with the sticky window.
+    """
+
+    def __init__(self, app: ASGIApp, sticky_seconds: float):
+        self.app = app
+        self.sticky_seconds = sticky_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in READ_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_last_write(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Sent once the route has committed, the replica is behind from this time on
+                written_at = f"{time.time():.3f}"
+                headers = MutableHeaders(scope=message)
+                headers.append(LAST_WRITE_HEADER, written_at)
+                headers.append(
+                    "Set-Cookie",
+                    f"{LAST_WRITE_COOKIE}={written_at}; Max-Age={math.ceil(self.sticky_seconds)}; "
+                    f"Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_last_write)
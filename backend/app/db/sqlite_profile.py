@@ -0,0 +1,112 @@
+import threading
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError
+from app.core.config import settings
+
+# Statements for which pysqlite opens a write transaction, and the BEGIN emitted below
+WRITE_STATEMENTS = ("INSERT", "UPDATE", "DELETE", "REPLACE", "BEGIN")
+
+_WRITE_LOCK_KEY = "sqlite_write_lock"
+_TRANSACTION_KEY = "sqlite_transaction"
+
+
+def sqlite_pragmas() -> dict[str, object]:
+    """
+    Connection PRAGMAs of the SQLite performance profile.
+    """
+    return {
+        # Readers keep reading the last committed state while a writer appends to the log
+        "journal_mode": "WAL",
+        # Safe with WAL, a power loss can only lose the last commits, never corrupt the file
+        "synchronous": "NORMAL",
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        "cache_size": -settings.SQLITE_CACHE_SIZE_KB,  # Negative means KiB instead of pages
+        "mmap_size": settings.SQLITE_MMAP_SIZE_MB * 1024 * 1024,
+        "foreign_keys": "ON",
+        "temp_store": "MEMORY",
+    }
+
+
+def apply_sqlite_profile(engine: Engine, serialize_writes: bool = True) -> None:
+    """
+    Tune every connection of a SQLite engine for concurrent use by one server process.
+
+    Writes of the process are serialized by a single lock, taken by the first INSERT, UPDATE or
+    DELETE of a transaction and released when it ends. Writers therefore wait in a queue in
+    Python instead of polling the database lock, and with WAL readers are never blocked.
+    pysqlite issues `BEGIN IMMEDIATE` at that same statement, so a write transaction never
+    has to upgrade a read lock and fail with `database is locked`. As a consequence a request
+    must not write through a second session while its own session holds uncommitted writes.
+    `serialize_writes=False` only sets the PRAGMAs and `BEGIN IMMEDIATE`.
+
+    pysqlite does not begin a transaction before a `SAVEPOINT` either, the savepoint would then
+    act as the outer transaction and its RELEASE commit on its own. A `BEGIN IMMEDIATE` is
+    emitted first in that case, as in SQLAlchemy's documented pysqlite workaround but without
+    turning every read-only transaction into a write transaction.
+    """
+    write_lock = threading.Lock()
+    lock_timeout = settings.SQLITE_BUSY_TIMEOUT_MS / 1000
+
+    def release(connection_info: dict) -> None:
+        if connection_info.pop(_WRITE_LOCK_KEY, False):
+            write_lock.release()
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = "IMMEDIATE"
+        cursor = dbapi_connection.cursor()
+        for name, value in sqlite_pragmas().items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def track_transaction(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip()[:7].upper().startswith(WRITE_STATEMENTS):
+            conn.info[_TRANSACTION_KEY] = True
+
+    @event.listens_for(engine, "savepoint")
+    def begin_before_savepoint(conn, name):
+        if not conn.info.get(_TRANSACTION_KEY):
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+    @event.listens_for(engine, "commit")
+    def end_transaction_on_commit(conn):
+        conn.info.pop(_TRANSACTION_KEY, None)
+
+    @event.listens_for(engine, "rollback")
+    def end_transaction_on_rollback(conn):
+        conn.info.pop(_TRANSACTION_KEY, None)
+
+    @event.listens_for(engine, "checkin")
+    def end_transaction_on_checkin(dbapi_connection, connection_record):
+        connection_record.info.pop(_TRANSACTION_KEY, None)
+
+    if not serialize_writes:
+        return
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def acquire_write_lock(conn, cursor, statement, parameters, context, executemany):
+        if conn.info.get(_WRITE_LOCK_KEY):
+            return
+        if not statement.lstrip()[:7].upper().startswith(WRITE_STATEMENTS):
+            return
+        if not write_lock.acquire(timeout=lock_timeout):
+            raise TimeoutError(
+                f"Timed out after {lock_timeout}s waiting for the SQLite write lock."
+            )
+        conn.info[_WRITE_LOCK_KEY] = True
+
+    @event.listens_for(engine, "commit")
+    def release_on_commit(conn):
+        # The next writer's BEGIN IMMEDIATE waits out this commit within busy_timeout
+        release(conn.info)
+
+    @event.listens_for(engine, "rollback")
+    def release_on_rollback(conn):
+        release(conn.info)
+
+    @event.listens_for(engine, "checkin")
+    def release_on_checkin(dbapi_connection, connection_record):
+        # Safety net for a connection returned to the pool without ending its transaction
+        release(connection_record.info)
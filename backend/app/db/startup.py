@@ -0,0 +1,127 @@
+import logging
+import re
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+from app.core.config import settings
+from app.db.base import Base, engine, log_engine_configuration, replica_engine
+
+MIGRATIONS_VERSIONS_DIR = Path(__file__).resolve().parents[2] / "migrations" / "versions"
+
+# Module level assignments of the Alembic revision template
+_REVISION_PATTERN = re.compile(r"^revision\b[^=]*=\s*['\"](\w+)['\"]", re.MULTILINE)
+_DOWN_REVISION_PATTERN = re.compile(r"^down_revision\b[^=]*=(.*)$", re.MULTILINE)
+
+# uvicorn configures this logger at INFO, the root logger only shows warnings
+logger = logging.getLogger("uvicorn.error")
+
+
+def migration_heads(versions_dir: Path = MIGRATIONS_VERSIONS_DIR) -> set[str]:
+    """
+    Return the head revisions of the migration scripts.
+
+    The revision identifiers are read from the source of the scripts instead of loading them
+    through Alembic, whose import alone takes longer than the rest of the check.
+    """
+    revisions = set()
+    down_revisions = set()
+    for script in versions_dir.glob("*.py"):
+        source = script.read_text()
+        revision = _REVISION_PATTERN.search(source)
+        if revision is None:
+            continue
+        revisions.add(revision.group(1))
+        down_revision = _DOWN_REVISION_PATTERN.search(source)
+        if down_revision is not None:
+            # A merge revision lists several parents
+            down_revisions.update(re.findall(r"['\"](\w+)['\"]", down_revision.group(1)))
+    return revisions - down_revisions
+
+
+def check_schema_revision(bind: Engine) -> None:
+    """
+    Compare the Alembic revision of the database with the head of the migration scripts.
+
+    Raises:
+
+        RuntimeError: If the database is not migrated to the head revision.
+    """
+    heads = migration_heads()
+    try:
+        with bind.connect() as connection:
+            current = {
+                row[0]
+                for row in connection.execute(text("SELECT version_num FROM alembic_version"))
+            }
+    except SQLAlchemyError as e:
+        raise RuntimeError(
+            f"Could not read the Alembic revision of the database, run `alembic upgrade head`: "
+            f"{str(e)}"
+        ) from e
+    if current != heads:
+        raise RuntimeError(
+            f"Database schema revision {', '.join(sorted(current)) or 'none'} does not match "
+            f"the migrations head {', '.join(sorted(heads))}, run `alembic upgrade head`."
+        )
+
+
+def warm_pool(bind: Engine, connections: int) -> None:
+    """
+    Open `connections` pool connections at once and return them to the pool, so that the first
+    requests do not pay for connecting.
+    """
+    opened = []
+    try:
+        for _ in range(connections):
+            opened.append(bind.connect())
+    finally:
+        for connection in opened:
+            connection.close()
+
+
+@contextmanager
+def _phase(name: str, timings: list[str]):
+    started = time.perf_counter()
+    yield
+    timings.append(f"{name} {(time.perf_counter() - started) * 1000:.1f}ms")
+
+
+def prepare_database() -> None:
+    """
+    Run the database part of the worker startup according to `DB_STARTUP_SCHEMA` and log the
+    time taken by each phase.
+
+    Raises:
+
+        RuntimeError: If the schema check fails, the worker then refuses to start.
+    """
+    timings = []
+    started = time.perf_counter()
+    log_engine_configuration()
+    with _phase(f"schema {settings.DB_STARTUP_SCHEMA}", timings):
+        if settings.DB_STARTUP_SCHEMA == "check":
+            check_schema_revision(engine)
+        elif settings.DB_STARTUP_SCHEMA == "create":
+            Base.metadata.create_all(bind=engine)
+    connections = min(settings.DB_STARTUP_WARM_CONNECTIONS, settings.DB_WORKER_POOL_SIZE)
+    if connections > 0:
+        with _phase(f"pool warmup ({connections} connections)", timings):
+            warm_pool(engine, connections)
+            if replica_engine is not None:
+                warm_pool(replica_engine, connections)
+    logger.info(
+        f"Database ready in {(time.perf_counter() - started) * 1000:.1f}ms: {', '.join(timings)}"
+    )
+
+
+def dispose_engines(close: bool = True) -> None:
+    """
+    Close the pooled connections of the sync engines. `close=False` only drops the pools
+    without closing their connections, for a forked worker whose parent still owns them.
+    """
+    engine.dispose(close=close)
+    if replica_engine is not None:
+        replica_engine.dispose(close=close)
@@ -1,8 +1,17 @@
+import time
+
+# Start of the worker's import phase, logged with the other startup phases
+_import_started = time.perf_counter()
+
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.db.base import Base
-from app.db.base import engine
+from app.db.async_base import async_engine
+from app.db.base import replica_engine
+from app.db.replica import LAST_WRITE_HEADER, LastWriteMiddleware
+from app.db.startup import dispose_engines, prepare_database
 from app.api.v1 import (
     users,
     roles,
@@ -20,9 +29,28 @@ from app.api.v1 import (
     testData,
 )
 from app.core.config import settings
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.password_hasher import password_hasher
+from app.core.query_stats import QueryStatsMiddleware
+
+_import_seconds = time.perf_counter() - _import_started
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Runs once per worker before it accepts requests, instead of at import time
+    logging.getLogger("uvicorn.error").info(
+        f"Application imported in {_import_seconds * 1000:.1f}ms"
+    )
+    prepare_database()
+    yield
+    password_hasher.shutdown()
+    if async_engine is not None:
+        await async_engine.dispose()
+    dispose_engines()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Allow requests from the React frontend
 origins = [
@@ -36,10 +64,22 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allows all methods
     allow_headers=["*"],  # Allows all headers
+    # Lets the browser read the cursor of paginated lists and the time of its last write
+    expose_headers=[NEXT_CURSOR_HEADER, LAST_WRITE_HEADER],
 )
 
+# Keeps the reads of a client on the primary for a while after it wrote, see app/db/replica.py
+if replica_engine is not None:
+    app.add_middleware(
+        LastWriteMiddleware, sticky_seconds=settings.REPLICA_STICKY_SECONDS
+    )
 
-Base.metadata.create_all(bind=engine)
+# Added last, so it wraps the other middleware and counts every statement of a request
+if settings.QUERY_STATS_ENABLED:
+    app.add_middleware(
+        QueryStatsMiddleware,
+        n_plus_one_threshold=settings.QUERY_STATS_N_PLUS_ONE_THRESHOLD,
+    )
 
 
 @app.get("/")
@@ -52,6 +92,12 @@ def health_check():
     return {"status": "Healthy"}
 
 
+# Registered first, the async routes take precedence over the sync routes of the same path
+if settings.DB_ASYNC_ROUTES:
+    app.include_router(transactions.async_router)
+    app.include_router(invoices.async_router)
+    app.include_router(items.async_router)
+
 app.include_router(testData.router)
 app.include_router(auth.router)
 app.include_router(users.router)
@@ -0,0 +1,7 @@
+# Pydantic models for request/response validation, keep separate from database models
+
+from pydantic import BaseModel, Field
+
+
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str = Field(..., min_length=1, max_length=255)
@@ -1,7 +1,7 @@
 # Pydantic models for request/response validation, keep separate from database models
 
 from pydantic import BaseModel, Field, field_validator
-from typing import Optional
+from typing import Any, Optional
 from datetime import datetime
 
 from app.schemas.department import DepartmentReadRequest
@@ -33,3 +33,10 @@ class CheckoutTransactionReadRequest(BaseModel):
 
     class Config:
         from_attributes = True  # Enables compatibility with SQLAlchemy models
+
+
+class CheckoutTransactionBatchReadRequest(BaseModel):
+    index: int  # Position of the checkout in the submitted batch
+    status_code: int  # 201 when the checkout was processed, the error status otherwise
+    transaction_id: Optional[int] = None
+    detail: Optional[Any] = None  # Error detail when the checkout was rejected
@@ -37,6 +37,7 @@ class UserUpdateRequest(BaseModel):
     user_name: Optional[str] = Field(
         None, min_length=1, max_length=50
     )  # Optional field
+    password: Optional[str] = Field(None, min_length=8)  # Optional field, hashed before it is stored
     enabled: Optional[bool] = Field(None)  # Optional field
 
     employee_id: Optional[int] = Field(
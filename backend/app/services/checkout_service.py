@@ -0,0 +1,256 @@
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+from fastapi import HTTPException
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette import status
+from app.db.models.checkout_item import CheckoutItem
+from app.db.models.checkout_transaction import CheckoutTransaction
+from app.db.models.department import Department
+from app.db.models.employee import Employee
+from app.db.models.item import Item
+from app.schemas.checkout_transaction import CheckoutTransactionCreateRequest
+from app.services.inventory_service import InventoryService
+
+
+@dataclass
+class CheckoutContext:
+    """
+    Lookups shared by the checkouts of a request, loaded once by `CheckoutService.load_context`.
+    """
+
+    employee_ids: set[int]
+    department_ids: set[int]
+    items: dict[int, Any]  # item_id -> row with name, category, unit_of_measure and quantity
+    stock: dict[int, int]  # item_id -> quantity, kept up to date across the checkouts of a batch
+
+
+class CheckoutService:
+    """
+    Set-based checkout engine.
+
+    Every line of a basket is resolved with a single `IN (...)` query, all
+    `CheckoutItem` / `InventoryAdjustmentLog` rows are written in bulk and the
+    stock is decremented by one conditional update, so the number of statements
+    per checkout does not grow with the basket size.
+    """
+
+    @staticmethod
+    def process(
+        db: Session,
+        transaction_request: CheckoutTransactionCreateRequest,
+        context: Optional[CheckoutContext] = None,
+    ) -> int:
+        """
+        Validate and write a checkout transaction. The caller owns the commit so
+        the whole checkout lands in a single database transaction.
+
+        Args:
+            context (CheckoutContext, optional): Lookups shared with other checkouts of the
+                same batch, loaded for this checkout alone when omitted.
+
+        Returns:
+            int: The ID of the new checkout transaction.
+        Raises:
+            HTTPException: If the employee, department or any item is not found,
+                           or if an item does not have enough quantity in stock.
+        """
+        if context is None:
+            context = CheckoutService.load_context(db, [transaction_request])
+
+        if transaction_request.employee_id not in context.employee_ids:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Employee with id {transaction_request.employee_id} not found.",
+            )
+        if transaction_request.department_id not in context.department_ids:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Department with id {transaction_request.department_id} not found.",
+            )
+
+        lines = transaction_request.checkout_items
+        items = context.items
+
+        # A basket may scan the same item on several lines, validate the total requested
+        requested: dict[int, int] = defaultdict(int)
+        for line in lines:
+            if line.item_id not in items:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Item with id {line.item_id} not found.",
+                )
+            requested[line.item_id] += line.quantity
+
+        for item_id, quantity in requested.items():
+            if context.stock[item_id] < quantity:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Item {items[item_id].name} has only {context.stock[item_id]} in stock.",
+                )
+
+        # Create the checkout transaction
+        new_transaction = CheckoutTransaction(
+            employee_id=transaction_request.employee_id,
+            department_id=transaction_request.department_id,
+            total_items=len(lines),
+        )
+        db.add(new_transaction)
+        db.flush()  # Writes to the database to generate `transaction_id` but doesn't commit
+        transaction_id = new_transaction.transaction_id
+
+        # Bulk insert the checkout lines, category and uom are taken from the item at the time of transaction.
+        # Returning the line number keeps the batched insert free of any ordering requirement.
+        checkout_item_ids = dict(
+            db.execute(
+                insert(CheckoutItem).returning(
+                    CheckoutItem.line_number, CheckoutItem.checkout_item_id
+                ),
+                [
+                    {
+                        "transaction_id": transaction_id,
+                        "line_number": index + 1,
+                        "item_id": line.item_id,
+                        "quantity": line.quantity,
+                        "category_id": items[line.item_id].category,
+                        "unit_of_measure": items[line.item_id].unit_of_measure,
+                    }
+                    for index, line in enumerate(lines)
+                ],
+            ).all()
+        )
+
+        # Decrement the stock atomically, the stock check above is repeated by the database
+        # so that concurrent checkouts of the same item can never oversell it
+        stock = InventoryService.adjust_stock(
+            db, {item_id: -quantity for item_id, quantity in requested.items()}
+        )
+        InventoryService.log_adjustments(
+            db,
+            stock,
+            [
+                {
+                    "item_id": line.item_id,
+                    "quantity": -line.quantity,
+                    "checkout_item_id": checkout_item_ids[index + 1],
+                }
+                for index, line in enumerate(lines)
+            ],
+            adjustment_type="checkout",
+        )
+
+        # Keep the shared stock up to date for the next checkouts of a batch
+        for item_id, (_, new_quantity) in stock.items():
+            context.stock[item_id] = new_quantity
+
+        return transaction_id
+
+    @staticmethod
+    def process_batch(
+        db: Session,
+        transaction_requests: list[CheckoutTransactionCreateRequest],
+        chunk_size: Optional[int] = None,
+        results: Optional[list[dict]] = None,
+        checkpoint: Optional[Callable[[list[dict]], None]] = None,
+    ) -> list[dict]:
+        """
+        Process queued checkouts, e.g. flushed by an offline kiosk on reconnect.
+
+        Employees, departments and items are looked up once for the whole batch. Each
+        checkout runs in its own savepoint so a failing entry is reported without
+        undoing the others. Without a chunk size the batch is a single database
+        transaction committed by the caller, otherwise every `chunk_size` entries are
+        committed as they complete.
+
+        `results` holds the results of entries processed by an earlier, interrupted run of
+        the same batch, processing resumes after them. `checkpoint` is called with the
+        results so far right before each chunk commit, in the transaction of the chunk.
+
+        Returns:
+            list[dict]: One result per entry, in request order.
+        """
+        results = list(results or [])
+        remaining = transaction_requests[len(results):]
+        if not remaining:
+            return results
+        context = CheckoutService.load_context(db, remaining)
+        for index, transaction_request in enumerate(remaining, start=len(results)):
+            try:
+                with db.begin_nested():
+                    transaction_id = CheckoutService.process(
+                        db, transaction_request, context
+                    )
+                results.append(
+                    {
+                        "index": index,
+                        "status_code": status.HTTP_201_CREATED,
+                        "transaction_id": transaction_id,
+                        "detail": None,
+                    }
+                )
+            except HTTPException as e:
+                results.append(
+                    {
+                        "index": index,
+                        "status_code": e.status_code,
+                        "transaction_id": None,
+                        "detail": e.detail,
+                    }
+                )
+            except IntegrityError as e:
+                results.append(
+                    {
+                        "index": index,
+                        "status_code": status.HTTP_400_BAD_REQUEST,
+                        "transaction_id": None,
+                        "detail": str(e.orig),
+                    }
+                )
+
+            if chunk_size and (index + 1) % chunk_size == 0:
+                if checkpoint is not None:
+                    checkpoint(results)
+                db.commit()
+
+        return results
+
+    @staticmethod
+    def load_context(
+        db: Session, transaction_requests: list[CheckoutTransactionCreateRequest]
+    ) -> CheckoutContext:
+        """
+        Resolve the employees, departments and items of one or more checkouts with one query each.
+        """
+        employee_ids = {request.employee_id for request in transaction_requests}
+        department_ids = {request.department_id for request in transaction_requests}
+        item_ids = {
+            line.item_id
+            for request in transaction_requests
+            for line in request.checkout_items
+        }
+
+        stmt = select(Employee.employee_id).where(Employee.employee_id.in_(employee_ids))
+        existing_employee_ids = set(db.execute(stmt).scalars().all())
+
+        stmt = select(Department.department_id).where(
+            Department.department_id.in_(department_ids)
+        )
+        existing_department_ids = set(db.execute(stmt).scalars().all())
+
+        stmt = select(
+            Item.item_id,
+            Item.name,
+            Item.category,
+            Item.unit_of_measure,
+            Item.quantity,
+        ).where(Item.item_id.in_(item_ids))
+        items = {row.item_id: row for row in db.execute(stmt)}
+
+        return CheckoutContext(
+            employee_ids=existing_employee_ids,
+            department_ids=existing_department_ids,
+            items=items,
+            stock={item_id: item.quantity for item_id, item in items.items()},
+        )
@@ -0,0 +1,184 @@
+import hashlib
+import json
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from starlette import status
+from app.core.config import settings
+from app.db.models.idempotency_key import IdempotencyKey
+
+
+# Status stored with the partial results of a chunked batch, a replay resumes after them
+PARTIAL_RESPONSE_STATUS = status.HTTP_206_PARTIAL_CONTENT
+
+
+def _utcnow() -> datetime:
+    # Timestamps are stored as naive UTC like the rest of the models
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class IdempotencyService:
+    """
+    Stores the response of a POST under its `Idempotency-Key` header so that a retried
+    request gets the stored response back instead of running the transaction again.
+
+    The lookup is a primary key hit on (endpoint, key) and the response is stored in
+    the same database transaction as the work it describes, so a key is either stored
+    together with its stock mutation or not at all.
+    """
+
+    _last_purge: float = 0.0
+
+    @staticmethod
+    def request_hash(request: BaseModel) -> str:
+        return hashlib.sha256(request.model_dump_json().encode()).hexdigest()
+
+    @staticmethod
+    def request_hash_many(requests: list[BaseModel]) -> str:
+        body = ",".join(request.model_dump_json() for request in requests)
+        return hashlib.sha256(f"[{body}]".encode()).hexdigest()
+
+    @staticmethod
+    def get_stored_response(
+        db: Session, endpoint: str, key: str, request_hash: str
+    ) -> Optional[JSONResponse]:
+        """
+        Return the stored response for a replayed key, or None if the key is new or expired.
+
+        Raises:
+            HTTPException: If the key was already used with a different request body (422).
+        """
+        stored = IdempotencyService.get_stored_key(db, endpoint, key, request_hash)
+        if stored is None:
+            return None
+        return IdempotencyService.replay(stored)
+
+    @staticmethod
+    def get_stored_key(
+        db: Session, endpoint: str, key: str, request_hash: str
+    ) -> Optional[IdempotencyKey]:
+        """
+        Return the stored key of a replayed request, or None if the key is new or expired.
+
+        Raises:
+            HTTPException: If the key was already used with a different request body (422).
+        """
+        stmt = select(IdempotencyKey).where(
+            IdempotencyKey.endpoint == endpoint, IdempotencyKey.key == key
+        )
+        stored = db.execute(stmt).scalars().first()
+        if stored is None:
+            return None
+
+        if stored.expires_at <= _utcnow():
+            # Expired but not purged yet, free the key so it can be stored again
+            db.delete(stored)
+            db.flush()
+            return None
+
+        if stored.request_hash != request_hash:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Idempotency-Key {key} was already used with a different request.",
+            )
+
+        return stored
+
+    @staticmethod
+    def replay(stored: IdempotencyKey) -> JSONResponse:
+        return JSONResponse(
+            status_code=stored.status_code,
+            content=json.loads(stored.response_body),
+            headers={"Idempotent-Replayed": "true"},
+        )
+
+    @staticmethod
+    def store_response(
+        db: Session,
+        endpoint: str,
+        key: str,
+        request_hash: str,
+        status_code: int,
+        body: Any,
+    ) -> None:
+        """
+        Add the response to the current transaction, the caller owns the commit.
+        """
+        db.add(
+            IdempotencyKey(
+                endpoint=endpoint,
+                key=key,
+                request_hash=request_hash,
+                status_code=status_code,
+                response_body=json.dumps(body),
+                expires_at=_utcnow()
+                + timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS),
+            )
+        )
+
+    @staticmethod
+    def update_response(
+        db: Session,
+        endpoint: str,
+        key: str,
+        previous_body: str,
+        status_code: int,
+        body: Any,
+    ) -> str:
+        """
+        Replace the response stored by an earlier step of the same request in the current
+        transaction, e.g. the partial results of a chunked batch. The caller owns the commit.
+
+        Returns:
+            str: The stored response body, to pass as `previous_body` of the next update.
+
+        Raises:
+            HTTPException: If a concurrent replay of the key stored another response since (409),
+                the caller must then roll back the work of this step.
+        """
+        response_body = json.dumps(body)
+        stmt = (
+            update(IdempotencyKey)
+            .where(
+                IdempotencyKey.endpoint == endpoint,
+                IdempotencyKey.key == key,
+                IdempotencyKey.response_body == previous_body,
+            )
+            .values(status_code=status_code, response_body=response_body)
+            .execution_options(synchronize_session=False)
+        )
+        if db.execute(stmt).rowcount != 1:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Idempotency-Key {key} is being processed by another request.",
+            )
+        return response_body
+
+    @staticmethod
+    def purge_expired(db: Session) -> None:
+        """
+        Delete expired keys, at most once per purge interval and worker so that the
+        checkout hot path only pays for it occasionally. Failures are logged and ignored.
+        """
+        now = time.monotonic()
+        if (
+            now - IdempotencyService._last_purge
+            < settings.IDEMPOTENCY_PURGE_INTERVAL_SECONDS
+        ):
+            return
+        IdempotencyService._last_purge = now
+
+        try:
+            stmt = delete(IdempotencyKey).where(IdempotencyKey.expires_at <= _utcnow())
+            db.execute(stmt)
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logging.error(f"Failed to purge expired idempotency keys: {str(e)}")
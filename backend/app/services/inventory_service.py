@@ -0,0 +1,109 @@
+from fastapi import HTTPException
+from sqlalchemy import case, insert, select, update
+from sqlalchemy.orm import Session
+from starlette import status
+from app.db.models.inventory_adjustment_log import InventoryAdjustmentLog
+from app.db.models.item import Item
+
+
+class InventoryService:
+    """
+    Stock mutation primitive shared by checkouts and scanned invoices.
+
+    Quantities are changed with a single conditional `UPDATE ... RETURNING`, the
+    database applies the change relative to the current value, so there is no
+    read-modify-write in Python and no row lock held while Python code runs.
+    """
+
+    @staticmethod
+    def adjust_stock(db: Session, changes: dict[int, int]) -> dict[int, tuple[int, int]]:
+        """
+        Atomically apply signed quantity changes to items.
+
+        For a single item this issues
+        `UPDATE items SET quantity = quantity - :n WHERE item_id = :id AND quantity >= :n RETURNING quantity`,
+        several items are updated by the same statement through a CASE on the item ID.
+
+        Args:
+            changes (dict[int, int]): Signed quantity change per item ID, negative values are decrements.
+        Returns:
+            dict[int, tuple[int, int]]: The (old, new) quantity per item ID.
+        Raises:
+            HTTPException: If any item does not have enough quantity in stock. Nothing is
+                           committed, the caller is expected to roll back the transaction.
+        """
+        if not changes:
+            return {}
+
+        change = case(changes, value=Item.item_id)
+        stmt = (
+            update(Item)
+            .where(Item.item_id.in_(changes.keys()), Item.quantity + change >= 0)
+            .values(quantity=Item.quantity + change)
+            .returning(Item.item_id, Item.quantity)
+            .execution_options(synchronize_session=False)
+        )
+        new_quantities = dict(db.execute(stmt).all())
+
+        missing = [item_id for item_id in changes if item_id not in new_quantities]
+        if missing:
+            InventoryService._raise_insufficient_stock(db, missing)
+
+        return {
+            item_id: (new_quantity - changes[item_id], new_quantity)
+            for item_id, new_quantity in new_quantities.items()
+        }
+
+    @staticmethod
+    def log_adjustments(
+        db: Session,
+        stock: dict[int, tuple[int, int]],
+        lines: list[dict],
+        adjustment_type: str,
+    ) -> None:
+        """
+        Bulk insert one inventory adjustment log per line from the values returned by `adjust_stock`.
+
+        Args:
+            stock (dict[int, tuple[int, int]]): The (old, new) quantity per item ID.
+            lines (list[dict]): The adjusted lines in order, each with `item_id`, the signed `quantity`
+                                and either `checkout_item_id` or `scanned_invoice_item_id`.
+            adjustment_type (str): e.g. 'checkout', 'received via scanned invoice'.
+        """
+        # Walk the lines in order so that each log entry records the running stock of its item
+        running_quantity = {item_id: old for item_id, (old, _) in stock.items()}
+        adjustment_logs = []
+        for line in lines:
+            old_value = running_quantity[line["item_id"]]
+            new_value = old_value + line["quantity"]
+            running_quantity[line["item_id"]] = new_value
+            adjustment_logs.append(
+                {
+                    "item_id": line["item_id"],
+                    "old_quantity": old_value,
+                    "new_quantity": new_value,
+                    "quantity_changed": abs(line["quantity"]),
+                    "adjustment_type": adjustment_type,
+                    "scanned_invoice_item_id": line.get("scanned_invoice_item_id"),
+                    "checkout_item_id": line.get("checkout_item_id"),
+                }
+            )
+
+        db.execute(insert(InventoryAdjustmentLog), adjustment_logs)
+
+    @staticmethod
+    def _raise_insufficient_stock(db: Session, item_ids: list[int]) -> None:
+        # Only reached on the failure path, report the current stock of the first offending item
+        stmt = select(Item.item_id, Item.name, Item.quantity).where(
+            Item.item_id.in_(item_ids)
+        )
+        result = db.execute(stmt).first()
+        if result is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Item with id {item_ids[0]} not found.",
+            )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Item {result.name} has only {result.quantity} in stock.",
+        )
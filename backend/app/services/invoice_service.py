@@ -0,0 +1,133 @@
+from collections import defaultdict
+from fastapi import HTTPException
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+from starlette import status
+from app.db.models.employee import Employee
+from app.db.models.item import Item
+from app.db.models.scanned_invoice import ScannedInvoice
+from app.db.models.scanned_invoice_item import ScannedInvoiceItem
+from app.db.models.vendor import Vendor
+from app.schemas.scanned_invoice import ScannedInvoiceCreateRequest
+from app.services.inventory_service import InventoryService
+
+
+class InvoiceService:
+    """
+    Set-based scanned invoice engine.
+
+    All item codes of an invoice are resolved with one query, the invoice lines and
+    adjustment logs are bulk inserted and the stock is incremented by one statement,
+    so the number of statements per invoice does not grow with the number of lines.
+    """
+
+    @staticmethod
+    def process(db: Session, scanned_invoice_request: ScannedInvoiceCreateRequest) -> int:
+        """
+        Validate and write a scanned invoice. The caller owns the commit so the whole
+        invoice lands in a single database transaction.
+
+        Returns:
+            int: The ID of the new scanned invoice.
+        Raises:
+            HTTPException: If the employee, the vendor or any item code is not found.
+        """
+        # Validate the employee exists
+        stmt = select(Employee.employee_id).where(
+            Employee.employee_id == scanned_invoice_request.scanned_by
+        )
+        if db.execute(stmt).scalars().first() is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Employee with id {scanned_invoice_request.scanned_by} not found.",
+            )
+
+        # Validate the vendor exists
+        stmt = select(Vendor.vendor_id).where(
+            Vendor.name == scanned_invoice_request.vendor_name
+        )
+        vendor_id = db.execute(stmt).scalars().first()
+        if vendor_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Vendor with name {scanned_invoice_request.vendor_name} not found.",
+            )
+
+        lines = scanned_invoice_request.scanned_invoice_items
+        item_ids = InvoiceService.resolve_item_codes(
+            db, {line.item_code for line in lines}
+        )
+
+        # Report every unknown code at once so the receiver can fix the whole invoice in one pass
+        unknown_codes = sorted({line.item_code for line in lines} - item_ids.keys())
+        if unknown_codes:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Items with item_code not found: {unknown_codes}",
+            )
+
+        # Create the scanned invoice
+        new_scanned_invoice = ScannedInvoice(
+            invoice_number=scanned_invoice_request.invoice_number,
+            vendor_id=vendor_id,
+            scanned_by=scanned_invoice_request.scanned_by,
+            image_file_path=scanned_invoice_request.image_file_path,
+            total_items=len(lines),
+        )
+        db.add(new_scanned_invoice)
+        db.flush()  # Writes to the database to generate `scan_id` but doesn't commit
+        scan_id = new_scanned_invoice.scan_id
+
+        # Bulk insert the invoice lines, returning the line number to map the generated IDs back
+        scanned_invoice_item_ids = dict(
+            db.execute(
+                insert(ScannedInvoiceItem).returning(
+                    ScannedInvoiceItem.line_number,
+                    ScannedInvoiceItem.scanned_invoice_item_id,
+                ),
+                [
+                    {
+                        "scan_id": scan_id,
+                        "line_number": index + 1,
+                        "item_id": item_ids[line.item_code],
+                        "item_code": line.item_code,
+                        "quantity": line.quantity,
+                    }
+                    for index, line in enumerate(lines)
+                ],
+            ).all()
+        )
+
+        # Increment the stock atomically and log the old/new values returned by the database
+        received: dict[int, int] = defaultdict(int)
+        for line in lines:
+            received[item_ids[line.item_code]] += line.quantity
+        stock = InventoryService.adjust_stock(db, received)
+        InventoryService.log_adjustments(
+            db,
+            stock,
+            [
+                {
+                    "item_id": item_ids[line.item_code],
+                    "quantity": line.quantity,
+                    "scanned_invoice_item_id": scanned_invoice_item_ids[index + 1],
+                }
+                for index, line in enumerate(lines)
+            ],
+            adjustment_type="received via scanned invoice",
+        )
+
+        return scan_id
+
+    @staticmethod
+    def resolve_item_codes(db: Session, item_codes: set[str]) -> dict[str, int]:
+        """
+        Map item codes to item IDs with a single query. When several items share a code
+        the oldest one wins, which matches the previous first-match lookup.
+        """
+        stmt = (
+            select(Item.item_code, func.min(Item.item_id))
+            .where(Item.item_code.in_(item_codes))
+            .group_by(Item.item_code)
+        )
+        return dict(db.execute(stmt).all())
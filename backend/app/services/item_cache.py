@@ -0,0 +1,119 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Iterable, Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.core.config import settings
+
+
+# Key of the `Session.info` entry holding the item IDs to invalidate once the transaction commits
+_PENDING_KEY = "item_cache_pending_invalidations"
+
+
+class ItemCache:
+    """
+    Process-local LRU cache of serialized `ItemReadRequest` payloads for the scanning hot path.
+
+    Entries are keyed by barcode and by item code and hold the JSON-ready payload, so a hit
+    skips the joins and Pydantic. Every entry is also indexed by item ID, writers invalidate by
+    item ID whichever key the item was cached under.
+
+    Stock is not cached: it changes with every checkout, in whichever worker served it, so
+    callers read `quantity` fresh and put it into the payload. Item edits invalidate their
+    entries, changes to the related category, vendor, department or unit of measure are only
+    picked up once the entry expires.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[tuple[str, str], tuple[int, dict[str, Any], float]] = OrderedDict()
+        self._keys_by_item: dict[int, set[tuple[str, str]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, kind: str, value: str) -> Optional[tuple[int, dict[str, Any]]]:
+        """
+        Return the item ID and cached payload for a ('barcode' | 'code', value) key, or None
+        on a miss. The payload is shared, copy it before changing it.
+        """
+        key = (kind, value)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            item_id, payload, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._remove(key, item_id)
+                return None
+            self._entries.move_to_end(key)
+            return item_id, payload
+
+    def put(self, kind: str, value: str, item_id: int, payload: dict[str, Any]) -> None:
+        key = (kind, value)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._keys_by_item.get(previous[0], set()).discard(key)
+            self._entries[key] = (
+                item_id,
+                payload,
+                time.monotonic() + self.ttl_seconds,
+            )
+            self._keys_by_item.setdefault(item_id, set()).add(key)
+
+            while len(self._entries) > self.max_entries:
+                oldest_key, (oldest_item_id, _, _) = next(iter(self._entries.items()))
+                self._remove(oldest_key, oldest_item_id)
+
+    def invalidate(self, item_ids: Iterable[int]) -> None:
+        with self._lock:
+            for item_id in item_ids:
+                for key in self._keys_by_item.pop(item_id, ()):
+                    self._entries.pop(key, None)
+
+    def invalidate_on_commit(self, db: Session, item_ids: Iterable[int]) -> None:
+        """
+        Invalidate the items once the outermost transaction of `db` commits. Invalidating
+        earlier would let a concurrent lookup cache the pre-commit row again.
+        """
+        db.info.setdefault(_PENDING_KEY, set()).update(item_ids)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_item.clear()
+
+    def _remove(self, key: tuple[str, str], item_id: int) -> None:
+        # Caller holds the lock
+        self._entries.pop(key, None)
+        keys = self._keys_by_item.get(item_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_item[item_id]
+
+
+item_cache = ItemCache(
+    max_entries=settings.ITEM_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.ITEM_CACHE_TTL_SECONDS,
+)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_items(session: Session) -> None:
+    # Also fired when a savepoint is released, its changes are not committed yet
+    if session.in_nested_transaction():
+        return
+    item_ids = session.info.pop(_PENDING_KEY, None)
+    if item_ids:
+        item_cache.invalidate(item_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_invalidations(session: Session) -> None:
+    # A savepoint rolled back keeps the invalidations of the enclosing transaction, an extra
+    # invalidation is harmless
+    if session.in_nested_transaction():
+        return
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,72 @@
+import threading
+import time
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.models.rbac import Permission, RolePermission, UserRole
+
+
+class PermissionCache:
+    """
+    Process-local cache of the permission names granted to each user through their roles.
+
+    A miss resolves the names with a single join over users_roles, roles_permissions and
+    permissions instead of lazy loading every role and its permissions. The RBAC endpoints
+    invalidate the cache after they commit, other workers pick the change up within the TTL.
+    """
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._entries: dict[int, tuple[frozenset[str], float]] = {}
+        self._lock = threading.Lock()
+        # Bumped by every invalidation so that a load started before it is not cached
+        self._generation = 0
+
+    def get_permissions(self, db: Session, user_id: int) -> frozenset[str]:
+        """
+        Return the permission names of the user, from the cache or loaded with one query.
+        """
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[1] > time.monotonic():
+                return entry[0]
+            generation = self._generation
+
+        permissions = self.load_permissions(db, user_id)
+
+        with self._lock:
+            if generation == self._generation:
+                self._entries[user_id] = (
+                    permissions,
+                    time.monotonic() + self.ttl_seconds,
+                )
+        return permissions
+
+    @staticmethod
+    def load_permissions(db: Session, user_id: int) -> frozenset[str]:
+        stmt = (
+            select(Permission.name)
+            .join(
+                RolePermission,
+                RolePermission.c.permission_id == Permission.permission_id,
+            )
+            .join(UserRole, UserRole.c.role_id == RolePermission.c.role_id)
+            .where(UserRole.c.user_id == user_id)
+        )
+        return frozenset(db.execute(stmt).scalars().all())
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        """
+        Drop every entry, used when a role or permission change can affect any user.
+        """
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+
+permission_cache = PermissionCache(ttl_seconds=settings.PERMISSION_CACHE_TTL_SECONDS)
@@ -0,0 +1,108 @@
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterable, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.models.rbac import Permission, RolePermission
+
+
+# A token with an unknown registry version reloads the registry at most once per interval
+RELOAD_ON_MISMATCH_INTERVAL_SECONDS = 1.0
+
+
+@dataclass(frozen=True)
+class RegistrySnapshot:
+    """
+    Permission names mapped to bit positions, in permission ID order, and the permission
+    bitmask granted by each role. `version` is a hash of both, every worker derives the
+    same version from the same table contents.
+    """
+
+    version: str
+    bits: dict[str, int]
+    role_masks: dict[int, int]
+
+    def mask_of(self, role_ids: Iterable[int]) -> int:
+        mask = 0
+        for role_id in role_ids:
+            mask |= self.role_masks.get(role_id, 0)
+        return mask
+
+    def has_permission(self, mask: int, permission_name: str) -> bool:
+        bit = self.bits.get(permission_name)
+        return bit is not None and bool(mask >> bit & 1)
+
+
+class PermissionRegistry:
+    """
+    Process-local, versioned permission registry backing the stateless principal tokens.
+
+    Any change to the permissions or to the permissions granted to a role changes the
+    version, so tokens minted against an older registry are rejected instead of being
+    read with shifted bit positions or outdated role grants.
+    """
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._snapshot: Optional[RegistrySnapshot] = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, version: Optional[str] = None) -> RegistrySnapshot:
+        """
+        Return the current snapshot, loading it when expired. If `version` is given and
+        differs, e.g. another worker already loaded a newer registry, reload early.
+        """
+        now = time.monotonic()
+        snapshot = self._snapshot
+        if snapshot is not None:
+            fresh = now - self._loaded_at < self.ttl_seconds
+            if fresh and (version is None or version == snapshot.version):
+                return snapshot
+            if fresh and now - self._loaded_at < RELOAD_ON_MISMATCH_INTERVAL_SECONDS:
+                return snapshot
+
+        snapshot = self.load(db)
+        with self._lock:
+            self._snapshot = snapshot
+            self._loaded_at = time.monotonic()
+        return snapshot
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._snapshot = None
+
+    @staticmethod
+    def load(db: Session) -> RegistrySnapshot:
+        permissions = db.execute(
+            select(Permission.permission_id, Permission.name).order_by(
+                Permission.permission_id
+            )
+        ).all()
+        grants = db.execute(
+            select(RolePermission.c.role_id, RolePermission.c.permission_id).order_by(
+                RolePermission.c.role_id, RolePermission.c.permission_id
+            )
+        ).all()
+
+        bit_by_id = {permission_id: bit for bit, (permission_id, _) in enumerate(permissions)}
+        role_masks: dict[int, int] = {}
+        for role_id, permission_id in grants:
+            role_masks[role_id] = role_masks.get(role_id, 0) | 1 << bit_by_id[permission_id]
+
+        digest = hashlib.sha256(
+            repr(([tuple(row) for row in permissions], [tuple(row) for row in grants])).encode()
+        )
+        return RegistrySnapshot(
+            version=digest.hexdigest()[:16],
+            bits={name: bit for bit, (_, name) in enumerate(permissions)},
+            role_masks=role_masks,
+        )
+
+
+permission_registry = PermissionRegistry(
+    ttl_seconds=settings.PERMISSION_CACHE_TTL_SECONDS
+)
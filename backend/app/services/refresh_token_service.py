@@ -0,0 +1,177 @@
+import hashlib
+import logging
+import secrets
+import time
+from datetime import datetime, timedelta, timezone
+from fastapi import HTTPException
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from starlette import status
+from app.core.config import settings
+from app.db.models.rbac import User
+from app.db.models.refresh_token import RefreshToken
+
+
+def _utcnow() -> datetime:
+    # Timestamps are stored as naive UTC like the rest of the models
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _hash_token(token: str) -> str:
+    # The token is 256 random bits, a fast hash is enough and keeps refresh free of bcrypt
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class RefreshTokenService:
+    """
+    Rotating refresh tokens.
+
+    Each refresh spends the presented token and issues a new one of the same family, the
+    lookup is a single indexed query on the token hash. Presenting a spent token means it
+    leaked, the whole family is then revoked so that neither party can keep refreshing.
+    """
+
+    _last_purge: float = 0.0
+
+    @staticmethod
+    def issue(db: Session, user_id: int, remember_me: bool = False) -> str:
+        """
+        Issue the first refresh token of a new family, e.g. at login, and commit it.
+        """
+        lifetime = (
+            timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS_WITH_REMEMBER_ME)
+            if remember_me
+            else timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+        )
+        token = RefreshTokenService._add(
+            db, user_id, secrets.token_hex(16), _utcnow() + lifetime
+        )
+        db.commit()
+        RefreshTokenService.purge_expired(db)
+        return token
+
+    @staticmethod
+    def rotate(db: Session, token: str) -> tuple[User, str]:
+        """
+        Spend a refresh token and issue its successor, committing both changes.
+
+        Returns:
+            tuple[User, str]: The owner of the token and the new refresh token.
+        Raises:
+            HTTPException: If the token is unknown, expired, already spent or its user is disabled (401).
+        """
+        stmt = (
+            select(RefreshToken, User)
+            .join(RefreshToken.user)
+            .where(RefreshToken.token_hash == _hash_token(token))
+        )
+        row = db.execute(stmt).first()
+        if row is None:
+            raise RefreshTokenService._unauthorized("Invalid refresh token.")
+        refresh_token, user = row
+
+        now = _utcnow()
+        if refresh_token.revoked_at is not None:
+            RefreshTokenService._revoke_family(db, refresh_token.family_id)
+            raise RefreshTokenService._unauthorized(
+                "Refresh token reuse detected, please log in again."
+            )
+        if refresh_token.expires_at <= now or not user.enabled:
+            raise RefreshTokenService._unauthorized("Invalid refresh token.")
+
+        # Spend the token only if no concurrent refresh spent it first
+        spent = db.execute(
+            update(RefreshToken)
+            .where(
+                RefreshToken.token_id == refresh_token.token_id,
+                RefreshToken.revoked_at.is_(None),
+            )
+            .values(revoked_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        if spent.rowcount != 1:
+            db.rollback()
+            RefreshTokenService._revoke_family(db, refresh_token.family_id)
+            raise RefreshTokenService._unauthorized(
+                "Refresh token reuse detected, please log in again."
+            )
+
+        # The successor keeps the expiry of the family, rotation does not extend a session
+        new_token = RefreshTokenService._add(
+            db, user.user_id, refresh_token.family_id, refresh_token.expires_at
+        )
+        db.commit()
+        return user, new_token
+
+    @staticmethod
+    def revoke(db: Session, token: str) -> None:
+        """
+        Revoke the family of a refresh token, e.g. at logout, and commit. Unknown tokens are ignored.
+        """
+        stmt = select(RefreshToken.family_id).where(
+            RefreshToken.token_hash == _hash_token(token)
+        )
+        family_id = db.execute(stmt).scalars().first()
+        if family_id is not None:
+            RefreshTokenService._revoke_family(db, family_id)
+
+    @staticmethod
+    def revoke_user(db: Session, user_id: int) -> None:
+        """
+        Revoke every refresh token of the user. The caller owns the commit.
+        """
+        db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=_utcnow())
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def purge_expired(db: Session) -> None:
+        """
+        Delete expired refresh tokens, at most once per purge interval and worker.
+        Failures are logged and ignored.
+        """
+        now = time.monotonic()
+        if (
+            now - RefreshTokenService._last_purge
+            < settings.REFRESH_TOKEN_PURGE_INTERVAL_SECONDS
+        ):
+            return
+        RefreshTokenService._last_purge = now
+
+        try:
+            db.execute(delete(RefreshToken).where(RefreshToken.expires_at <= _utcnow()))
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logging.error(f"Failed to purge expired refresh tokens: {str(e)}")
+
+    @staticmethod
+    def _add(db: Session, user_id: int, family_id: str, expires_at: datetime) -> str:
+        token = secrets.token_urlsafe(32)
+        db.add(
+            RefreshToken(
+                token_hash=_hash_token(token),
+                user_id=user_id,
+                family_id=family_id,
+                expires_at=expires_at,
+            )
+        )
+        return token
+
+    @staticmethod
+    def _revoke_family(db: Session, family_id: str) -> None:
+        db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=_utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+
+    @staticmethod
+    def _unauthorized(detail: str) -> HTTPException:
+        return HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=detail)
@@ -0,0 +1,201 @@
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple, Optional
+from sqlalchemy import delete, event, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.models.revoked_token import RevokedToken
+
+
+# Revocations committed out of order, or by a worker with a slightly late clock, are still
+# picked up as long as they land within this window behind the newest one already loaded
+SYNC_OVERLAP = timedelta(seconds=30)
+
+# Expired revocations are purged from the table at most once per interval and worker
+PURGE_INTERVAL_SECONDS = 300
+
+# Key of the `Session.info` entry holding the revocations to apply once the transaction commits
+_PENDING_KEY = "revocation_list_pending"
+
+
+class _Revocation(NamedTuple):
+    # The columns `_apply` reads, copied off the row so that they survive the commit's expiry
+    jti: Optional[str]
+    user_id: Optional[int]
+    revoked_at: datetime
+    expires_at: datetime
+
+
+def _utcnow() -> datetime:
+    # Timestamps are stored as naive UTC like the rest of the models
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _longest_access_token_lifetime() -> timedelta:
+    return max(
+        timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+        timedelta(days=settings.ACCESS_TOKEN_EXPIRE_DAYS_WITH_REMEMBER_ME),
+    )
+
+
+class RevocationList:
+    """
+    In-process copy of the `revoked_tokens` table.
+
+    Checking a token is a set and dict lookup, the table is only read to pull the revocations
+    added since the last sync, at most once per `REVOCATION_SYNC_INTERVAL_SECONDS` and worker.
+    Revocations made by this worker apply once their transaction commits, those of other
+    workers within the interval. Entries are dropped once the tokens they revoke have expired,
+    so the sets stay small.
+    """
+
+    def __init__(self, sync_interval_seconds: int):
+        self.sync_interval_seconds = sync_interval_seconds
+        self._jtis: dict[str, datetime] = {}  # jti -> expires_at
+        self._user_cutoffs: dict[int, tuple[datetime, datetime]] = {}  # user_id -> (revoked_at, expires_at)
+        self._watermark: Optional[datetime] = None  # Newest revoked_at loaded
+        self._synced_at = 0.0
+        self._last_purge = 0.0
+        self._sync_lock = threading.Lock()
+        # Guards the changes to and the iterations over `_jtis` and `_user_cutoffs`, lookups
+        # need no lock
+        self._lock = threading.Lock()
+
+    def is_revoked(self, db: Session, payload: dict) -> bool:
+        """
+        Check the decoded claims of an access token against the revocation list, syncing
+        it first when the interval has elapsed.
+        """
+        self.sync(db)
+
+        jti = payload.get("jti")
+        if jti is not None and jti in self._jtis:
+            return True
+
+        cutoff = self._user_cutoffs.get(payload.get("id"))
+        if cutoff is not None:
+            # Tokens issued before the cutoff are revoked, tokens without `iat` predate the claim.
+            # Both sides have sub-second precision, a token issued in the same second as the
+            # revocation but after it stays valid.
+            issued_at = payload.get("iat", 0)
+            return issued_at < cutoff[0].replace(tzinfo=timezone.utc).timestamp()
+        return False
+
+    def revoke_token(self, db: Session, jti: str, expires_at: datetime) -> None:
+        """
+        Revoke a single access token until it expires. The caller owns the commit, the
+        revocation applies in this worker once it succeeds.
+        """
+        revocation = _Revocation(jti, None, _utcnow(), expires_at)
+        db.add(RevokedToken(**revocation._asdict()))
+        self._apply_on_commit(db, revocation)
+
+    def revoke_user(self, db: Session, user_id: int) -> None:
+        """
+        Revoke every access token issued to the user so far. The caller owns the commit, the
+        revocation applies in this worker once it succeeds.
+        """
+        now = _utcnow()
+        revocation = _Revocation(None, user_id, now, now + _longest_access_token_lifetime())
+        db.add(RevokedToken(**revocation._asdict()))
+        self._apply_on_commit(db, revocation)
+
+    def sync(self, db: Session, force: bool = False) -> None:
+        if not force and time.monotonic() - self._synced_at < self.sync_interval_seconds:
+            return
+        # One request syncs while the others keep using the current copy
+        if not self._sync_lock.acquire(blocking=False):
+            return
+        try:
+            now = _utcnow()
+            stmt = select(
+                RevokedToken.jti,
+                RevokedToken.user_id,
+                RevokedToken.revoked_at,
+                RevokedToken.expires_at,
+            ).where(RevokedToken.expires_at > now)
+            if self._watermark is not None:
+                stmt = stmt.where(RevokedToken.revoked_at > self._watermark - SYNC_OVERLAP)
+            for revocation in db.execute(stmt).all():
+                self._apply(revocation)
+                # Only rows read back from the table move the watermark, a local revocation
+                # made before the first sync must not hide the older ones
+                if self._watermark is None or self._watermark < revocation.revoked_at:
+                    self._watermark = revocation.revoked_at
+            self._prune(now)
+            self._synced_at = time.monotonic()
+        except SQLAlchemyError as e:
+            # Keep serving the current copy, the next request retries
+            logging.error(f"Failed to sync the token revocation list: {str(e)}")
+        finally:
+            self._sync_lock.release()
+
+    def purge_expired(self, db: Session) -> None:
+        """
+        Delete the revocations whose tokens have expired, at most once per purge interval
+        and worker. Commits the session, failures are logged and ignored.
+        """
+        now = time.monotonic()
+        if now - self._last_purge < PURGE_INTERVAL_SECONDS:
+            return
+        self._last_purge = now
+
+        try:
+            db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= _utcnow()))
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logging.error(f"Failed to purge expired token revocations: {str(e)}")
+
+    def _apply_on_commit(self, db: Session, revocation: _Revocation) -> None:
+        # Applied by `_apply_committed_revocations`, a failed commit must not leave this worker
+        # with a revocation the other workers never see
+        db.info.setdefault(_PENDING_KEY, []).append((self, revocation))
+
+    def _apply(self, revocation: _Revocation) -> None:
+        with self._lock:
+            if revocation.jti is not None:
+                self._jtis[revocation.jti] = revocation.expires_at
+            if revocation.user_id is not None:
+                current = self._user_cutoffs.get(revocation.user_id)
+                if current is None or current[0] < revocation.revoked_at:
+                    self._user_cutoffs[revocation.user_id] = (
+                        revocation.revoked_at,
+                        revocation.expires_at,
+                    )
+
+    def _prune(self, now: datetime) -> None:
+        with self._lock:
+            for jti in [jti for jti, expires_at in self._jtis.items() if expires_at <= now]:
+                del self._jtis[jti]
+            for user_id in [
+                user_id
+                for user_id, (_, expires_at) in self._user_cutoffs.items()
+                if expires_at <= now
+            ]:
+                del self._user_cutoffs[user_id]
+
+
+revocation_list = RevocationList(
+    sync_interval_seconds=settings.REVOCATION_SYNC_INTERVAL_SECONDS
+)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed_revocations(session: Session) -> None:
+    # Also fired when a savepoint is released, its changes are not committed yet
+    if session.in_nested_transaction():
+        return
+    for revocations, revocation in session.info.pop(_PENDING_KEY, ()):
+        revocations._apply(revocation)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_revocations(session: Session) -> None:
+    # The revoking endpoints do not use savepoints, a rolled back one leaves the list alone
+    if session.in_nested_transaction():
+        return
+    session.info.pop(_PENDING_KEY, None)
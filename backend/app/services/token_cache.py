@@ -0,0 +1,96 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from app.core.config import settings
+from app.db.models.rbac import User
+
+
+class TokenCache:
+    """
+    Bounded LRU cache of the users resolved from access tokens, keyed by the raw token.
+
+    An entry holds the decoded claims and the column values of the user and lives until the
+    token expires, a hit skips both `jwt.decode` and the user query. The values are turned
+    back into a `User` attached to the request session, relationships still lazy load
+    through that session.
+    `max_entries=0` disables the cache.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[int, dict, dict]] = OrderedDict()
+        self._tokens_by_user: dict[int, set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, db: Session, token: str) -> Optional[tuple[User, dict]]:
+        """
+        Return the user of the token attached to `db` and the token claims, or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None or entry[2]["exp"] <= time.time():
+                if entry is not None:
+                    self._remove(token)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            _, values, payload = entry
+
+        user_model = User(**values)
+        make_transient_to_detached(user_model)
+        return db.merge(user_model, load=False), payload  # Attaches without querying
+
+    def put(self, token: str, user_model: User, payload: dict) -> None:
+        if self.max_entries <= 0:
+            return
+        values = {
+            attribute.key: getattr(user_model, attribute.key)
+            for attribute in inspect(User).column_attrs
+        }
+        with self._lock:
+            if token in self._entries:
+                self._remove(token)
+            self._entries[token] = (user_model.user_id, values, payload)
+            self._tokens_by_user.setdefault(user_model.user_id, set()).add(token)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id: int) -> None:
+        """
+        Drop every cached token of the user, e.g. after it was disabled, updated or deleted.
+        """
+        with self._lock:
+            for token in self._tokens_by_user.pop(user_id, ()):
+                self._entries.pop(token, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _remove(self, token: str) -> None:
+        # Caller holds the lock
+        user_id, _, _ = self._entries.pop(token)
+        tokens = self._tokens_by_user.get(user_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[user_id]
+
+
+token_cache = TokenCache(max_entries=settings.TOKEN_CACHE_MAX_ENTRIES)
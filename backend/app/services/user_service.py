@@ -1,15 +1,33 @@
-from app.core.config import settings
+from typing import Optional
+from app.core.password_hasher import password_hasher
 from app.db.models.rbac import User
 
 
 class UserService:
+    # Hashing and verification run on the bounded password hasher pool, not in the request thread
     @staticmethod
     def set_password(user: User, password: str) -> None:
-        user.hashed_password = settings.bcrypt_context.hash(password)
+        user.hashed_password = password_hasher.hash(password)
 
     @staticmethod
     def check_password(user: User, password: str) -> bool:
-        return settings.bcrypt_context.verify(password, user.hashed_password)
+        return password_hasher.verify(password, user.hashed_password)
+
+    @staticmethod
+    async def check_password_async(user: User, password: str) -> bool:
+        return await password_hasher.verify_async(password, user.hashed_password)
+
+    @staticmethod
+    async def check_and_upgrade_password_async(
+        user: User, password: str
+    ) -> tuple[bool, Optional[str]]:
+        """
+        Check the password like `check_password_async`, also returning a fresh hash when the
+        stored one is outdated. Persisting the new hash is up to the caller.
+        """
+        return await password_hasher.verify_and_update_async(
+            password, user.hashed_password
+        )
 
 
 # Example Usage
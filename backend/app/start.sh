@@ -3,5 +3,14 @@
 # Run Alembic migrations
 alembic upgrade head
 
-# Start the Uvicorn server
-uvicorn app.main:app --host 0.0.0.0 --port 8000 --reload
\ No newline at end of file
+# Workers only check that the migrations above have been applied
+export DB_STARTUP_SCHEMA=check
+
+if [ "$SERVER_MODE" = "dev" ]; then
+    # Development: a single process reloading on code changes
+    export WEB_CONCURRENCY=1
+    exec uvicorn app.main:app --host 0.0.0.0 --port 8000 --reload
+fi
+
+# Production: one worker per CPU core by default on PostgreSQL, see gunicorn.conf.py
+exec gunicorn app.main:app
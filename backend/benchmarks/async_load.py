@@ -0,0 +1,136 @@
+"""
+Compare the requests per second of the sync routes and of the async routes (`DB_ASYNC_ROUTES`)
+under many concurrent clients. Starts one uvicorn server per mode against a throw-away SQLite
+database and drives it with httpx, from the backend directory:
+
+    python -m benchmarks.async_load [clients] [seconds] [endpoint ...]
+
+The endpoints are `barcode`, `list` and `checkout`, all three by default. Requires httpx.
+The load generator runs in this process, give the host enough cores for both the client and
+the server or the comparison measures the client.
+"""
+
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.db.base import Base
+from benchmarks.sqlite_checkout import ITEMS, seed
+
+PORT = 8765
+BACKEND_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def request_for(endpoint: str, number: int) -> tuple[str, str, dict | None]:
+    item = number % ITEMS
+    if endpoint == "barcode":
+        return "GET", f"/items/barcode/{1000 + item}", None
+    if endpoint == "list":
+        return "GET", "/items/", None
+    return (
+        "POST",
+        "/transactions/",
+        {
+            "employee_id": 1,
+            "department_id": 1,
+            "checkout_items": [{"item_id": item + 1, "quantity": 1}],
+        },
+    )
+
+
+def start_server(directory: str, async_routes: bool) -> subprocess.Popen:
+    environment = dict(
+        os.environ,
+        PYTHONPATH=BACKEND_DIRECTORY,
+        DB_ASYNC_ROUTES=str(async_routes).lower(),
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(PORT)]
+        + ["--log-level", "warning", "--backlog", "2048"],
+        cwd=directory,  # The SQLite database is ./app.db
+        env=environment,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{PORT}/healthy")
+            return server
+        except httpx.TransportError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("The server did not start.")
+
+
+async def load(clients: int, seconds: float, endpoint: str) -> dict:
+    latencies = []
+    errors = 0
+    deadline = time.monotonic() + seconds
+
+    async def client(number: int, http: httpx.AsyncClient) -> None:
+        nonlocal errors
+        while time.monotonic() < deadline:
+            method, path, body = request_for(endpoint, number)
+            started = time.perf_counter()
+            try:
+                response = await http.request(method, path, json=body)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+            number += clients
+
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(
+        base_url=f"http://127.0.0.1:{PORT}", limits=limits, timeout=60
+    ) as http:
+        started = time.perf_counter()
+        await asyncio.gather(*(client(number, http) for number in range(clients)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests_per_second": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000,
+        "errors": errors,
+    }
+
+
+def main() -> None:
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+    endpoints = sys.argv[3:] or ["barcode", "list", "checkout"]
+
+    print(f"clients: {clients}, seconds per run: {seconds:.0f}")
+    for endpoint in endpoints:
+        for async_routes in (False, True):
+            with tempfile.TemporaryDirectory() as directory:
+                engine = create_engine(f"sqlite:///{os.path.join(directory, 'app.db')}")
+                Base.metadata.create_all(bind=engine)
+                seed(sessionmaker(bind=engine))
+                engine.dispose()
+
+                server = start_server(directory, async_routes)
+                try:
+                    result = asyncio.run(load(clients, seconds, endpoint))
+                finally:
+                    server.terminate()
+                    server.wait()
+
+            mode = "async" if async_routes else "sync "
+            print(
+                f"{endpoint:>8} {mode}: {result['requests_per_second']:8.1f} req/s, "
+                f"p50 {result['p50_ms']:7.1f} ms, p99 {result['p99_ms']:7.1f} ms, "
+                f"{result['errors']} errors"
+            )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
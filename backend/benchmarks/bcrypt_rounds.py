@@ -0,0 +1,62 @@
+"""
+Measure the bcrypt hashing time per cost factor on this host and recommend the highest cost
+that stays within a latency target, to be set as `BCRYPT_ROUNDS`. From the backend directory:
+
+    python -m benchmarks.bcrypt_rounds [target_ms] [samples]
+
+Each cost step doubles the time. Logins verify one hash each, so the throughput column is the
+ceiling of logins per second with every core hashing.
+"""
+
+import os
+import statistics
+import sys
+import time
+from passlib.hash import bcrypt
+from app.core.config import settings
+
+MIN_ROUNDS = 4
+MAX_ROUNDS = 16
+
+
+def measure(rounds: int, samples: int) -> float:
+    """
+    Return the median time in milliseconds to hash a password with the cost factor.
+    """
+    handler = bcrypt.using(rounds=rounds)
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        handler.hash("calibration-password")
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    target_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 250.0
+    samples = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    cpu_count = os.cpu_count() or 1
+    bcrypt.using(rounds=MIN_ROUNDS).hash("warm-up")  # Loads the backend outside the timings
+
+    print(f"target:  {target_ms:.0f} ms per hash, {samples} samples per cost, {cpu_count} cores")
+    print(f"current: BCRYPT_ROUNDS={settings.BCRYPT_ROUNDS}")
+    print(f"{'rounds':>6} {'median ms':>10} {'logins/s':>9}")
+
+    recommended = None
+    for rounds in range(MIN_ROUNDS, MAX_ROUNDS + 1):
+        elapsed = measure(rounds, samples)
+        print(f"{rounds:>6} {elapsed:>10.1f} {cpu_count * 1000 / elapsed:>9.1f}")
+        if elapsed <= target_ms:
+            recommended = rounds
+        else:
+            # The next cost takes twice as long, no need to measure it
+            break
+
+    if recommended is None:
+        print(f"even rounds={MIN_ROUNDS} exceeds the target, keep the current setting")
+    else:
+        print(f"recommended: BCRYPT_ROUNDS={recommended}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""
+Print the query plans of the hot endpoint queries before and after the index migration.
+
+Each revision is migrated into a throw-away SQLite database in a temporary directory, the
+configured database is never touched. Run from the backend directory:
+
+    python -m benchmarks.explain_plans
+"""
+
+import os
+import sys
+import tempfile
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, exists, select, text
+from sqlalchemy.dialects import sqlite
+from app.db.models.checkout_item import CheckoutItem
+from app.db.models.checkout_transaction import CheckoutTransaction
+from app.db.models.employee import Employee
+from app.db.models.inventory_adjustment_log import InventoryAdjustmentLog
+from app.db.models.item import Item
+from app.db.models.scanned_invoice import ScannedInvoice
+from app.db.models.scanned_invoice_item import ScannedInvoiceItem
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (revision label, revision) pairs to compare
+REVISIONS = (
+    ("before", "7503d3c2f4c3"),
+    ("after", "head"),
+)
+
+# Hot endpoint -> the query it runs
+HOT_QUERIES = {
+    "GET /items/barcode/{barcode}": select(Item).where(Item.barcode == "1000"),
+    "GET /items/code/{item_code}": select(Item).where(Item.item_code == "C0"),
+    "GET /items/low-stock": select(Item).where(
+        Item.quantity < Item.low_stock_threshold
+    ),
+    "GET /transactions/?item_id=": select(CheckoutTransaction).where(
+        exists().where(
+            CheckoutItem.transaction_id == CheckoutTransaction.transaction_id,
+            CheckoutItem.item_id == 1,
+        )
+    ),
+    "GET /transactions/{id} (checkout lines)": select(CheckoutItem).where(
+        CheckoutItem.transaction_id.in_([1, 2, 3])
+    ),
+    "GET /invoices/{id} (invoice lines)": select(ScannedInvoiceItem).where(
+        ScannedInvoiceItem.scan_id.in_([1, 2, 3])
+    ),
+    "POST /invoices/ (duplicate invoice number)": select(ScannedInvoice).where(
+        ScannedInvoice.vendor_id == 1, ScannedInvoice.invoice_number == "INV-1"
+    ),
+    "Item adjustment history": select(InventoryAdjustmentLog)
+    .where(InventoryAdjustmentLog.item_id == 1)
+    .order_by(InventoryAdjustmentLog.adjusted_at.desc()),
+    "Adjustment logs by time range": select(InventoryAdjustmentLog).where(
+        InventoryAdjustmentLog.adjusted_at >= "2024-01-01"
+    ),
+    "Employees of a department": select(Employee).where(Employee.department_id == 1),
+}
+
+
+def migrate(directory: str, revision: str) -> str:
+    """
+    Migrate an empty SQLite database in `directory` to `revision` and return its URL.
+    """
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+
+    # The migration environment resolves the SQLite URL relative to the working directory
+    cwd = os.getcwd()
+    os.chdir(directory)
+    try:
+        command.upgrade(config, revision)
+    finally:
+        os.chdir(cwd)
+    return f"sqlite:///{os.path.join(directory, 'app.db')}"
+
+
+def explain(url: str) -> dict[str, list[str]]:
+    engine = create_engine(url)
+    plans = {}
+    with engine.connect() as connection:
+        for name, stmt in HOT_QUERIES.items():
+            sql = stmt.compile(
+                dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}
+            )
+            rows = connection.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+            plans[name] = [row[-1] for row in rows]
+    engine.dispose()
+    return plans
+
+
+def main() -> None:
+    results = {}
+    for label, revision in REVISIONS:
+        with tempfile.TemporaryDirectory() as directory:
+            results[label] = explain(migrate(directory, revision))
+
+    for name in HOT_QUERIES:
+        print(name)
+        for label, _ in REVISIONS:
+            for line in results[label][name]:
+                print(f"  {label:<7}{line}")
+        print()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""
+Compare the checkout throughput of concurrent clients on SQLite with and without the
+performance profile of app/db/sqlite_profile.py. Runs against throw-away databases, from the
+backend directory:
+
+    python -m benchmarks.sqlite_checkout [threads] [checkouts_per_thread]
+
+Each thread posts single-line checkouts against a shared set of items, as several tills would,
+and lists the recent transactions in between so that readers compete with the writers.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from sqlalchemy import create_engine, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import sessionmaker
+from app.db.base import Base
+from app.db.models import (
+    CheckoutTransaction,
+    Department,
+    Employee,
+    Item,
+    ItemCategory,
+    UnitOfMeasure,
+    Vendor,
+)
+from app.db.sqlite_profile import apply_sqlite_profile
+from app.schemas.checkout_item import CheckoutItemCreateRequest
+from app.schemas.checkout_transaction import CheckoutTransactionCreateRequest
+from app.services.checkout_service import CheckoutService
+
+ITEMS = 20
+
+
+def seed(session_factory) -> None:
+    with session_factory() as db:
+        db.add_all(
+            [
+                Department(name="Benchmark", description="Benchmark"),
+                Vendor(name="Benchmark", description="Benchmark"),
+                ItemCategory(name="Benchmark", description="Benchmark"),
+                UnitOfMeasure(name="each", abbreviation="ea", description="Each"),
+            ]
+        )
+        db.flush()
+        db.add(
+            Employee(
+                employee_number="00000001",
+                first_name="Bench",
+                last_name="Mark",
+                department_id=1,
+            )
+        )
+        db.add_all(
+            Item(
+                item_code=f"B{index}",
+                name=f"Item {index}",
+                category=1,
+                vendor_id=1,
+                owner_department=1,
+                unit_of_measure=1,
+                has_barcode=True,
+                barcode=f"{1000 + index}",
+                quantity=1_000_000,
+            )
+            for index in range(ITEMS)
+        )
+        db.commit()
+
+
+def run(profile: bool, threads: int, checkouts: int) -> dict:
+    """
+    Return the checkouts per second and the number of failed checkouts for one configuration.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(
+            f"sqlite:///{os.path.join(directory, 'app.db')}",
+            pool_size=threads,
+            max_overflow=0,
+        )
+        if profile:
+            apply_sqlite_profile(engine)
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        seed(session_factory)
+
+        failures = []
+
+        def till(number: int) -> None:
+            for index in range(checkouts):
+                request = CheckoutTransactionCreateRequest(
+                    employee_id=1,
+                    department_id=1,
+                    checkout_items=[
+                        CheckoutItemCreateRequest(
+                            item_id=(number + index) % ITEMS + 1, quantity=1
+                        )
+                    ],
+                )
+                with session_factory() as db:
+                    try:
+                        db.execute(
+                            select(CheckoutTransaction.transaction_id)
+                            .order_by(CheckoutTransaction.transaction_id.desc())
+                            .limit(20)
+                        ).all()
+                        CheckoutService.process(db, request)
+                        db.commit()
+                    except SQLAlchemyError as e:
+                        db.rollback()
+                        failures.append(str(e.orig) if hasattr(e, "orig") else str(e))
+
+        workers = [threading.Thread(target=till, args=(n,)) for n in range(threads)]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+        engine.dispose()
+
+    succeeded = threads * checkouts - len(failures)
+    return {
+        "checkouts_per_second": succeeded / elapsed,
+        "failed": len(failures),
+        "errors": sorted(set(failures))[:3],
+    }
+
+
+def main() -> None:
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    checkouts = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    print(f"threads: {threads}, checkouts per thread: {checkouts}")
+    for profile in (False, True):
+        result = run(profile, threads, checkouts)
+        label = "with the profile:   " if profile else "without the profile:"
+        print(
+            f"{label} {result['checkouts_per_second']:8.1f} checkouts/s, "
+            f"{result['failed']} failed {result['errors'] or ''}"
+        )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
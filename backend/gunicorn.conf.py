@@ -0,0 +1,66 @@
+# Production server: gunicorn supervising uvicorn workers, started by app/start.sh with
+#   gunicorn app.main:app
+# from the backend directory, which picks up this file. Tuned through the server section of
+# app/core/config.py, e.g. WEB_CONCURRENCY=4. A SQLite database always gets a single worker.
+#
+# Every worker keeps the following state for itself, with N workers:
+# - login limiter: each worker has its own buckets, N workers allow N times the configured
+#   rate unless a shared BucketStore is plugged in (app/core/login_limiter.py)
+# - item cache: another worker's cached barcode lookup shows item edits within
+#   ITEM_CACHE_TTL_SECONDS, the stock is always read fresh (app/services/item_cache.py)
+# - permission cache: revoked permissions apply on the other workers within
+#   PERMISSION_CACHE_TTL_SECONDS
+# - revocation list and token cache: a logout applies on the other workers within
+#   REVOCATION_SYNC_INTERVAL_SECONDS
+# - password hasher pool: PASSWORD_HASHER_MAX_WORKERS threads per worker
+# - database pools: see DB_MAX_CONNECTIONS
+# Read-your-writes stickiness of the read replica travels with the client and holds across
+# workers (app/db/replica.py).
+from app.core.config import settings
+
+bind = "0.0.0.0:8000"
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = settings.SERVER_WORKERS
+
+# Import the application once in the arbiter and fork the workers from it, which saves every
+# worker the import and shares its memory pages until they are written to. The database work
+# of the startup still runs in each worker, in the lifespan of app/main.py.
+preload_app = True
+
+# Recycle workers after a number of requests so that slow leaks and fragmentation stay bounded,
+# the jitter keeps them from restarting all at once
+max_requests = settings.SERVER_MAX_REQUESTS
+max_requests_jitter = settings.SERVER_MAX_REQUESTS_JITTER
+
+keepalive = settings.SERVER_KEEPALIVE_SECONDS
+backlog = settings.SERVER_BACKLOG
+timeout = settings.SERVER_TIMEOUT_SECONDS
+graceful_timeout = settings.SERVER_GRACEFUL_TIMEOUT_SECONDS
+
+# Client address and scheme taken from the X-Forwarded-* headers set by these proxies
+forwarded_allow_ips = settings.FORWARDED_ALLOW_IPS
+
+accesslog = "-"
+errorlog = "-"
+
+
+def on_starting(server):
+    if settings.WEB_CONCURRENCY > workers:
+        server.log.warning(
+            f"WEB_CONCURRENCY={settings.WEB_CONCURRENCY} ignored, SQLite is served by a single worker"
+        )
+    server.log.info(
+        f"Starting {workers} workers, database pool per worker: "
+        f"pool_size={settings.DB_WORKER_POOL_SIZE} max_overflow={settings.DB_WORKER_MAX_OVERFLOW}"
+    )
+
+
+def post_fork(server, worker):
+    # Pools inherited from the arbiter must not be shared across processes, every worker opens
+    # its own connections
+    from app.db.async_base import async_engine
+    from app.db.startup import dispose_engines
+
+    dispose_engines(close=False)
+    if async_engine is not None:
+        async_engine.sync_engine.dispose(close=False)
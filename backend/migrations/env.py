@@ -24,6 +24,9 @@ from app.db.models import (
     checkout_transaction,
     checkout_item,
     inventory_adjustment_log,
+    idempotency_key,
+    refresh_token,
+    revoked_token,
 )
 
 
@@ -93,7 +96,7 @@ def run_migrations_online() -> None:
     configuration = config.get_section(config.config_ini_section)
     configuration["sqlalchemy.url"] = get_url()
     connectable = create_engine(configuration["sqlalchemy.url"])
-    print(get_url())
+    print(connectable.url.render_as_string(hide_password=True))
     with connectable.connect() as connection:
         context.configure(connection=connection, target_metadata=target_metadata)
 
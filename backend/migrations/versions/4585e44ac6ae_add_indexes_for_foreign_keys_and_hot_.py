@@ -0,0 +1,46 @@
+"""Add indexes for foreign keys and hot filters
+
+The indexes are built CONCURRENTLY on PostgreSQL so that the tables stay writable while they
+are created. CREATE INDEX CONCURRENTLY cannot run inside a transaction, hence the autocommit block.
+Other backends ignore the `postgresql_*` options.
+
+Revision ID: 4585e44ac6ae
+Revises: 7503d3c2f4c3
+Create Date: 2026-10-18 01:19:49.803795
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4585e44ac6ae'
+down_revision: Union[str, None] = '7503d3c2f4c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+LOW_STOCK = sa.text('quantity < low_stock_threshold')
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(op.f('ix_employees_department_id'), 'employees', ['department_id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_inventory_adjustment_logs_adjusted_at', 'inventory_adjustment_logs', ['adjusted_at'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_inventory_adjustment_logs_item_id_adjusted_at', 'inventory_adjustment_logs', ['item_id', 'adjusted_at'], unique=False, postgresql_concurrently=True)
+        op.create_index(op.f('ix_items_barcode'), 'items', ['barcode'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_items_low_stock', 'items', ['item_id'], unique=False, postgresql_where=LOW_STOCK, sqlite_where=LOW_STOCK, postgresql_concurrently=True)
+        # Fails if a vendor already has duplicated invoice numbers, they have to be cleaned up first
+        op.create_index('uq_scanned_invoices_vendor_invoice_number', 'scanned_invoices', ['vendor_id', 'invoice_number'], unique=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('uq_scanned_invoices_vendor_invoice_number', table_name='scanned_invoices', postgresql_concurrently=True)
+        op.drop_index('ix_items_low_stock', table_name='items', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_items_barcode'), table_name='items', postgresql_concurrently=True)
+        op.drop_index('ix_inventory_adjustment_logs_item_id_adjusted_at', table_name='inventory_adjustment_logs', postgresql_concurrently=True)
+        op.drop_index('ix_inventory_adjustment_logs_adjusted_at', table_name='inventory_adjustment_logs', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_employees_department_id'), table_name='employees', postgresql_concurrently=True)
@@ -0,0 +1,118 @@
+# Shared fixtures: the application on an in-memory SQLite database, seeded through the API.
+# Run from the backend directory with `python -m pytest`, see requirements-dev.txt.
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.db.base import Base, get_db, session_factory_for
+from app.main import app
+
+TRANSACTIONS = 6
+INVOICES = 4
+ITEMS = 5
+
+
+@pytest.fixture(scope="session")
+def session_factory():
+    # One connection shared by every session, an in-memory database lives as long as it
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def client(session_factory):
+    def get_test_db():
+        with session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = get_test_db
+    # Streaming endpoints open their own sessions from the factory
+    app.dependency_overrides[session_factory_for] = lambda: session_factory
+    # Not entered as a context manager, the lifespan would prepare the configured database
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture(scope="session")
+def seeded_client(client):
+    """
+    The client on a database with several transactions and invoices of several lines each, so
+    that a lazy load per row would show up in the statement counts.
+    """
+    for path, rows in [
+        ("departments", [{"name": "Store", "description": "Store"}]),
+        ("vendors", [{"name": "Acme", "description": "Acme"}]),
+        ("item-categories", [{"name": "Tools", "description": "Tools"}]),
+        ("uoms", [{"name": "each", "abbreviation": "ea", "description": "Each"}]),
+        (
+            "employees",
+            [
+                {
+                    "employee_number": f"0000000{number}",
+                    "first_name": "Test",
+                    "last_name": f"Employee {number}",
+                    "department_id": 1,
+                }
+                for number in range(1, 4)
+            ],
+        ),
+        (
+            "items",
+            [
+                {
+                    "item_code": f"T{index}",
+                    "name": f"Item {index}",
+                    "description": "Test item",
+                    "category": 1,
+                    "vendor_id": 1,
+                    "owner_department": 1,
+                    "has_barcode": True,
+                    "barcode": f"{5000 + index}",
+                    "unit_of_measure": 1,
+                    "quantity": 1000,
+                    "low_stock_threshold": 5,
+                }
+                for index in range(ITEMS)
+            ],
+        ),
+    ]:
+        response = client.post(f"/insert-test-data/{path}", json=rows)
+        assert response.status_code == 201, response.text
+
+    for number in range(TRANSACTIONS):
+        response = client.post(
+            "/transactions/",
+            json={
+                "employee_id": number % 3 + 1,
+                "department_id": 1,
+                "checkout_items": [
+                    {"item_id": (number + line) % ITEMS + 1, "quantity": 1}
+                    for line in range(3)
+                ],
+            },
+        )
+        assert response.status_code == 201, response.text
+
+    for number in range(INVOICES):
+        response = client.post(
+            "/invoices/",
+            json={
+                "invoice_number": f"INV-{number}",
+                "vendor_name": "Acme",
+                "scanned_by": number % 3 + 1,
+                "scanned_invoice_items": [
+                    {"item_code": f"T{(number + line) % ITEMS}", "quantity": 10}
+                    for line in range(3)
+                ],
+            },
+        )
+        assert response.status_code == 201, response.text
+
+    return client
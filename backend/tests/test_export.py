@@ -0,0 +1,74 @@
+import csv
+import io
+import json
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.db.base import session_factory_for
+from app.main import app
+from tests.conftest import TRANSACTIONS
+
+
+def _expected_lines(client) -> list[tuple[int, int, int]]:
+    # (transaction_id, employee_id, item_id) of every checkout line, oldest transaction first
+    transactions = sorted(
+        client.get("/transactions/").json(), key=lambda row: row["transaction_id"]
+    )
+    return [
+        (transaction["transaction_id"], transaction["employee"]["employee_id"], line["item_id"])
+        for transaction in transactions
+        for line in sorted(transaction["checkout_items"], key=lambda line: line["line_number"])
+    ]
+
+
+def test_csv_export_matches_the_checkouts(seeded_client):
+    response = seeded_client.get("/transactions/export")
+
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == TRANSACTIONS * 3
+    assert [
+        (int(row["transaction_id"]), int(row["employee_id"]), int(row["item_id"]))
+        for row in rows
+    ] == _expected_lines(seeded_client)
+
+
+def test_ndjson_export_matches_the_checkouts(seeded_client):
+    response = seeded_client.get("/transactions/export", params={"format": "ndjson"})
+
+    assert response.status_code == 200, response.text
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [
+        (row["transaction_id"], row["employee_id"], row["item_id"]) for row in rows
+    ] == _expected_lines(seeded_client)
+
+
+def test_empty_export_is_the_csv_header(seeded_client):
+    response = seeded_client.get("/transactions/export", params={"from": "2100-01-01T00:00:00"})
+
+    assert response.status_code == 200, response.text
+    assert response.text.startswith("transaction_id,")
+    assert response.text.count("\n") == 1
+
+
+@pytest.fixture
+def broken_database(seeded_client):
+    # A database without tables, the export query fails once the response has started
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    previous = app.dependency_overrides[session_factory_for]
+    app.dependency_overrides[session_factory_for] = lambda: sessionmaker(bind=engine)
+    yield seeded_client
+    app.dependency_overrides[session_factory_for] = previous
+    engine.dispose()
+
+
+def test_failed_export_is_aborted(broken_database):
+    # The error propagates to the server, which drops the connection instead of ending the body.
+    # Starlette streams from a task group, the error comes out wrapped in an exception group.
+    with pytest.RaisesGroup(OperationalError, flatten_subgroups=True):
+        broken_database.get("/transactions/export")
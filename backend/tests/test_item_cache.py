@@ -0,0 +1,59 @@
+from sqlalchemy import update
+from app.api.v1.items import _read_item_cached
+from app.core.query_stats import query_budget
+from app.db.models import Item
+from app.services.item_cache import item_cache
+
+
+def test_hit_reads_stock_fresh(seeded_client, session_factory):
+    item_cache.clear()
+    seeded_client.get("/items/barcode/5000")
+
+    # Stock changed behind the cache, as by a checkout in another worker
+    with session_factory() as db:
+        db.execute(update(Item).where(Item.barcode == "5000").values(quantity=Item.quantity - 7))
+        db.commit()
+
+    with query_budget(1) as requests:
+        response = seeded_client.get("/items/barcode/5000")
+    expected = seeded_client.get("/items/id/1").json()
+
+    assert response.status_code == 200, response.text
+    assert requests[0].count == 1
+    assert response.json() == expected
+
+
+def test_hit_on_item_deleted_elsewhere_is_a_miss(session_factory):
+    item_cache.clear()
+    item_cache.put("barcode", "missing", 12345, {"item_id": 12345, "quantity": 1})
+    with session_factory() as db:
+        assert _read_item_cached(db, "barcode", "missing", Item.barcode == "missing") is None
+    assert item_cache.get("barcode", "missing") is None
+
+
+def test_invalidation_waits_for_the_outermost_commit(session_factory):
+    item_cache.clear()
+    item_cache.put("barcode", "5000", 1, {"item_id": 1})
+    with session_factory() as db:
+        with db.begin_nested():
+            item_cache.invalidate_on_commit(db, [1])
+        # Savepoint released, the enclosing transaction is still open
+        assert item_cache.get("barcode", "5000") is not None
+
+        with db.begin_nested() as savepoint:
+            savepoint.rollback()
+        assert item_cache.get("barcode", "5000") is not None
+
+        db.commit()
+    assert item_cache.get("barcode", "5000") is None
+
+
+def test_rollback_discards_pending_invalidations(session_factory):
+    item_cache.clear()
+    item_cache.put("barcode", "5000", 1, {"item_id": 1})
+    with session_factory() as db:
+        db.begin()
+        item_cache.invalidate_on_commit(db, [1])
+        db.rollback()
+        db.commit()
+    assert item_cache.get("barcode", "5000") is not None
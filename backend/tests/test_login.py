@@ -0,0 +1,29 @@
+from passlib.hash import bcrypt
+from sqlalchemy import select
+from app.core.config import settings
+from app.db.models.rbac import User
+
+
+def test_login_rehashes_a_low_cost_hash(client, session_factory):
+    with session_factory() as db:
+        db.add(
+            User(
+                user_name="rehash",
+                hashed_password=bcrypt.using(rounds=4).hash("secret-password"),
+                enabled=True,
+            )
+        )
+        db.commit()
+
+    response = client.post(
+        "/auth/token", data={"username": "rehash", "password": "secret-password"}
+    )
+
+    assert response.status_code == 200, response.text
+    assert response.json()["user_name"] == "rehash"
+    with session_factory() as db:
+        hashed_password = db.execute(
+            select(User.hashed_password).where(User.user_name == "rehash")
+        ).scalar_one()
+    assert hashed_password.startswith(f"$2b${settings.BCRYPT_ROUNDS:02d}$")
+    assert settings.bcrypt_context.verify("secret-password", hashed_password)
@@ -0,0 +1,27 @@
+from app.core.pagination import NEXT_CURSOR_HEADER
+from tests.conftest import TRANSACTIONS
+
+
+def test_transactions_unpaginated_without_limit_or_cursor(seeded_client):
+    # The frontend fetches the full list and searches it client-side
+    response = seeded_client.get("/transactions/")
+
+    assert response.status_code == 200, response.text
+    assert len(response.json()) == TRANSACTIONS
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+
+def test_transactions_pages_follow_the_cursor(seeded_client):
+    pages = []
+    params = {"limit": 4}
+    while True:
+        response = seeded_client.get("/transactions/", params=params)
+        assert response.status_code == 200, response.text
+        pages.append([row["transaction_id"] for row in response.json()])
+        if NEXT_CURSOR_HEADER not in response.headers:
+            break
+        params = {"limit": 4, "cursor": response.headers[NEXT_CURSOR_HEADER]}
+
+    everything = [row["transaction_id"] for row in seeded_client.get("/transactions/").json()]
+    assert [len(page) for page in pages] == [4, TRANSACTIONS - 4]
+    assert sum(pages, []) == everything
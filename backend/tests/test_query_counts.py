@@ -0,0 +1,31 @@
+# Statement counts of the list and detail endpoints, pinned by the eager-loading chains of
+# app/db/loader_options.py. A count going up means a relationship is lazy-loaded per row.
+import pytest
+from app.core.query_stats import query_budget
+
+
+@pytest.mark.parametrize(
+    "path, statements",
+    [
+        # Transactions with employee and department joined, then their lines in one SELECT ... IN
+        ("/transactions/", 2),
+        ("/transactions/1", 2),
+        # Invoices with vendor and employee joined, then their lines, then the items of the lines
+        ("/invoices/", 3),
+        ("/invoices/1", 3),
+    ],
+)
+def test_statement_count(seeded_client, path, statements):
+    with query_budget(statements) as requests:
+        response = seeded_client.get(path)
+
+    assert response.status_code == 200, response.text
+    assert requests[0].count == statements
+
+
+def test_list_statement_count_does_not_depend_on_page_size(seeded_client):
+    with query_budget(2) as requests:
+        seeded_client.get("/transactions/", params={"limit": 1})
+        seeded_client.get("/transactions/", params={"limit": 100})
+
+    assert [stats.count for stats in requests] == [2, 2]
@@ -0,0 +1,101 @@
+import re
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+from app.api.v1 import items
+from app.core.query_stats import QueryStatsMiddleware, query_budget
+from app.db.async_base import get_async_db
+from app.db.base import Base
+from app.db.models import Department, Item, ItemCategory, UnitOfMeasure, Vendor
+
+
+def test_budget_counts_statements_of_sync_routes(seeded_client):
+    # Sync routes run in the thread pool, the statements reach the request's stats from there
+    with query_budget(3) as requests:
+        response = seeded_client.get("/invoices/")
+
+    assert response.status_code == 200, response.text
+    assert [(stats.method, stats.path, stats.count) for stats in requests] == [
+        ("GET", "/invoices/", 3)
+    ]
+
+
+def test_budget_fails_when_exceeded(seeded_client):
+    with pytest.raises(AssertionError, match=r"GET /invoices/ ran 3 statements, budget 2"):
+        with query_budget(2):
+            seeded_client.get("/invoices/")
+
+
+def test_server_timing_header(seeded_client):
+    response = seeded_client.get("/transactions/")
+
+    assert re.fullmatch(
+        r'db;dur=\d+\.\d;desc="2 queries"', response.headers["server-timing"]
+    )
+
+
+@pytest.fixture
+def async_client(tmp_path):
+    """
+    The async barcode lookup, which runs the sync lookup through `AsyncSession.run_sync`, on a
+    SQLite file with one item.
+    """
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        db.add_all(
+            [
+                Department(name="Store", description="Store"),
+                Vendor(name="Acme", description="Acme"),
+                ItemCategory(name="Tools", description="Tools"),
+                UnitOfMeasure(name="each", abbreviation="ea", description="Each"),
+            ]
+        )
+        db.flush()
+        db.add(
+            Item(
+                item_code="A1",
+                name="Async item",
+                description="Async item",
+                category=1,
+                vendor_id=1,
+                owner_department=1,
+                unit_of_measure=1,
+                has_barcode=True,
+                barcode="987654",
+                quantity=10,
+            )
+        )
+        db.commit()
+    engine.dispose()
+
+    # Connections are not pooled, aiosqlite binds them to the event loop of the test client
+    async_engine = create_async_engine(
+        url.replace("sqlite://", "sqlite+aiosqlite://"), poolclass=NullPool
+    )
+    async_session_factory = async_sessionmaker(bind=async_engine, class_=AsyncSession)
+
+    async def get_test_async_db():
+        async with async_session_factory() as db:
+            yield db
+
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware)
+    app.include_router(items.async_router)
+    app.dependency_overrides[get_async_db] = get_test_async_db
+    with TestClient(app) as client:
+        yield client
+
+
+def test_budget_counts_statements_of_async_routes(async_client):
+    with query_budget(1) as requests:
+        response = async_client.get("/items/barcode/987654")
+
+    assert response.status_code == 200, response.text
+    assert requests[0].count == 1
+    assert response.headers["server-timing"].endswith('desc="1 query"')
@@ -0,0 +1,71 @@
+import threading
+from datetime import datetime, timedelta
+from jose import jwt
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.services.revocation_list import RevocationList, _Revocation
+
+
+def _claims(token: str) -> dict:
+    return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
+
+def test_user_revocation_spares_tokens_issued_in_the_same_second_after_it(session_factory):
+    revocations = RevocationList(sync_interval_seconds=60)
+    with session_factory() as db:
+        before = _claims(create_access_token("revoked", 42, timedelta(minutes=5)))
+        revocations.revoke_user(db, 42)
+        after = _claims(create_access_token("revoked", 42, timedelta(minutes=5)))
+        db.commit()
+
+        assert revocations.is_revoked(db, before)
+        assert not revocations.is_revoked(db, after)
+        assert revocations.is_revoked(db, {"id": 42})  # No `iat`, predates the claim
+        assert not revocations.is_revoked(db, {"id": 7, "iat": 0})
+
+
+def test_revocation_applies_once_committed(session_factory):
+    revocations = RevocationList(sync_interval_seconds=60)
+    expires_at = datetime.utcnow() + timedelta(minutes=5)
+    with session_factory() as db:
+        revocations.sync(db, force=True)
+
+        revocations.revoke_token(db, "rolled-back", expires_at)
+        assert not revocations.is_revoked(db, {"jti": "rolled-back"})
+        db.rollback()
+        assert not revocations.is_revoked(db, {"jti": "rolled-back"})
+
+        revocations.revoke_token(db, "committed", expires_at)
+        db.commit()
+        assert revocations.is_revoked(db, {"jti": "committed"})
+
+
+def test_prune_tolerates_concurrent_revocations():
+    revocations = RevocationList(sync_interval_seconds=60)
+    expires_at = datetime.utcnow() + timedelta(minutes=5)
+    for number in range(10000):
+        revocations._apply(_revocation(f"old-{number}", expires_at))
+
+    errors = []
+
+    def revoke():
+        try:
+            for number in range(20000):
+                revocations._apply(_revocation(f"new-{number}", expires_at))
+        except RuntimeError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=revoke)
+    thread.start()
+    try:
+        for _ in range(200):
+            revocations._prune(datetime.utcnow())
+    except RuntimeError as e:
+        errors.append(e)
+    thread.join()
+
+    assert errors == []
+
+
+def _revocation(jti: str, expires_at: datetime) -> _Revocation:
+    return _Revocation(jti, None, datetime.utcnow(), expires_at)